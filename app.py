@@ -1,19 +1,50 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, Response, stream_with_context
 from config import Config
-from controller.database import db
-from controller.models import User, Role, Quiz, Question, Option, QuizSubmission, StudentAnswer
+from controller.database import db, configure_sqlite_engine
+from controller.models import User, Role, Quiz, Question, Option, QuizSubmission
+from controller.answer_key import get_answer_key, invalidate_answer_key, grade_answers
+from controller.regrade import regrade_quiz
+from controller.short_answer_grading import grade_short_answers
+from controller.grading_queue import grading_queue, grade_clusters
+from controller.submissions import save_submission
+from controller.drafts import init_drafts, record_draft_answers, get_draft, discard_draft
+from controller.quiz_render import render_quiz_questions
+from controller.migrations import run_migrations
+from controller.openrouter_client import chat_completion, parse_questions, stream_questions
+from controller.generation_cache import cache_key, get_cached_questions, store_questions
+from controller.chunked_generation import generate_in_chunks, question_fingerprint
+from controller.duplicate_index import (
+    SimilarityIndex, find_duplicate, index_questions, unindex_question, unindex_quiz, drop_teacher_index
+)
+from controller.dashboard import pending_quizzes_page, completed_submissions_page, teacher_quiz_summaries, users_page
+from controller.platform_stats import (
+    get_platform_stats, record_user_added, record_user_deleted, record_quiz_added, record_quiz_deleted
+)
+from controller.item_analysis import get_item_analysis
+from controller.question_import import validate_question, parse_import_file, validate_rows, import_questions
+from controller.exports import EXPORT_KINDS, EXPORT_FORMATS, stream_csv, stream_parquet, parquet_available
+from controller.identity import get_user_role, remember_user_role, invalidate_user_role
+from controller.jobs import (
+    init_jobs, job_handler, enqueue_job, complete_job, count_active_jobs, get_job, job_params, job_result,
+    wait_for_progress
+)
+from controller.metrics import init_metrics, render_metrics
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from functools import wraps
 from datetime import datetime
+import click
+import hmac
 import json
-import socket
-from urllib import request as urllib_request
-from urllib import error as urllib_error
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import sys
+import threading
+import time
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 db.init_app(app)
+configure_sqlite_engine(app)
 
 # -------------------
 # INITIALIZE DATABASE
@@ -21,6 +52,7 @@ db.init_app(app)
 def init_database():
     with app.app_context():
         db.create_all()
+        run_migrations()
 
         # Create roles if they don't exist
         roles = ["Admin", "Teacher", "Student"]
@@ -39,6 +71,9 @@ def init_database():
             db.session.commit()
 
 init_database()
+init_jobs(app, app.config.get('OPENROUTER_HARD_TIMEOUT_SECONDS', 40))
+init_metrics(app)
+init_drafts(app)
 
 
 def generate_questions_with_openrouter(
@@ -48,7 +83,10 @@ def generate_questions_with_openrouter(
     marks,
     difficulty='medium',
     syllabus_scope='',
-    output_language='English'
+    output_language='English',
+    force_fresh=False,
+    part=None,
+    on_question=None
 ):
     api_key = app.config.get('OPENROUTER_API_KEY')
     model = app.config.get('OPENROUTER_MODEL')
@@ -56,6 +94,18 @@ def generate_questions_with_openrouter(
     if not api_key:
         raise ValueError('OPENROUTER_API_KEY is not configured')
 
+    # Identical requests (same inputs and model) are served from the generation cache
+    generation_key = cache_key(
+        model, topic, question_type, count, marks, difficulty, syllabus_scope, output_language, part
+    )
+    if not force_fresh:
+        cached_questions = get_cached_questions(generation_key, app.config)
+        if cached_questions is not None:
+            if on_question:
+                for question in cached_questions:
+                    on_question(question)
+            return cached_questions
+
     type_instructions = {
         'mcq': (
             'Generate only MCQ questions. '
@@ -92,69 +142,194 @@ def generate_questions_with_openrouter(
         'True/False -> "correct_answer"; '
         'Short Answer -> "correct_answer".'
     )
+    if part:
+        user_prompt += (
+            f'\nThis is part {part[0]} of {part[1]} of a larger set. '
+            'Cover a different aspect of the topic than the other parts so questions do not repeat.'
+        )
 
-    timeout_seconds = app.config.get('OPENROUTER_TIMEOUT_SECONDS', 25)
-
-    payload = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        "temperature": 0.7,
-        "max_tokens": 1400,
-        "stream": False,
-        "response_format": {"type": "json_object"}
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    completion_options = {
+        'temperature': 0.7,
+        'max_tokens': 1400,
+        'response_format': {"type": "json_object"}
     }
 
-    req = urllib_request.Request(
-        "https://openrouter.ai/api/v1/chat/completions",
-        data=json.dumps(payload).encode("utf-8"),
-        headers={
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        },
-        method="POST"
-    )
+    if on_question and app.config.get('OPENROUTER_STREAMING', True):
+        # Each question is handed to on_question as soon as it is complete; a timeout keeps partial output
+        questions, complete = stream_questions(messages, on_question, config=app.config, **completion_options)
+    else:
+        questions = parse_questions(chat_completion(messages, config=app.config, **completion_options))
+        complete = True
+        if on_question:
+            for question in questions:
+                on_question(question)
+
+    if complete:
+        store_questions(generation_key, model, questions, app.config)
+    return questions
 
-    try:
-        with urllib_request.urlopen(req, timeout=timeout_seconds) as response:
-            raw = response.read().decode("utf-8")
-            result = json.loads(raw)
-    except socket.timeout:
-        raise ValueError(f"OpenRouter request timed out after {timeout_seconds} seconds")
-    except urllib_error.HTTPError as e:
-        error_body = e.read().decode("utf-8", errors="ignore")
-        raise ValueError(f"OpenRouter API error ({e.code}): {error_body}")
-    except urllib_error.URLError as e:
-        raise ValueError(f"OpenRouter connection error: {e.reason}")
-    except Exception as e:
-        raise ValueError(f"Unexpected error while calling OpenRouter: {str(e)}")
 
-    try:
-        content = result["choices"][0]["message"]["content"]
-        data = json.loads(content)
-    except Exception:
-        raise ValueError("OpenRouter returned an unexpected response format")
+def save_generated_questions(quiz_id, question_type, marks, generated_questions, before_commit=None):
+    """
+    Validate AI-generated questions and add the usable ones to a quiz
+
+    Near-duplicates of the teacher's existing questions (or of each other) are skipped.
+
+    Args:
+        before_commit: Optional callback(saved_count, duplicate_count) run in the saving transaction;
+            returning False rolls the questions back
+
+    Returns:
+        (saved_count, duplicate_count)
+
+    Raises:
+        ValueError: if the quiz was deleted (e.g. while a background generation was running)
+            or before_commit rejected the save
+    """
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None:
+        raise ValueError('Quiz no longer exists')
+    teacher_id = quiz.teacher_id
+    threshold = app.config.get('DUPLICATE_SIMILARITY_THRESHOLD', 0.8)
+    batch_index = SimilarityIndex()
+    saved_questions = []
+    duplicate_count = 0
+    for item in generated_questions:
+        question_text = str(item.get('question_text', '')).strip()
+        q_marks = item.get('marks', marks)
+        try:
+            q_marks = int(q_marks)
+        except (TypeError, ValueError):
+            q_marks = marks
 
-    questions = data.get("questions", [])
-    if not isinstance(questions, list) or not questions:
-        raise ValueError("OpenRouter did not return valid questions")
+        if not question_text:
+            continue
 
-    return questions
+        if find_duplicate(teacher_id, question_text, threshold) or batch_index.find(question_text, threshold):
+            duplicate_count += 1
+            continue
+
+        question = Question(
+            quiz_id=quiz_id,
+            question_text=question_text,
+            question_type=question_type,
+            marks=max(1, q_marks)
+        )
+        db.session.add(question)
+        db.session.flush()
 
+        if question_type == 'mcq':
+            options = item.get('options', [])
+            correct_option_index = item.get('correct_option_index')
+            if not isinstance(options, list) or len(options) < 2:
+                db.session.delete(question)
+                continue
 
-def generate_questions_with_hard_timeout(**kwargs):
-    hard_timeout = app.config.get('OPENROUTER_HARD_TIMEOUT_SECONDS', 40)
-    with ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(generate_questions_with_openrouter, **kwargs)
-        try:
-            return future.result(timeout=hard_timeout)
-        except FutureTimeoutError:
-            raise ValueError(
-                f"AI generation exceeded {hard_timeout} seconds. "
-                "Please try fewer questions or a shorter topic."
-            )
+            try:
+                correct_option_index = int(correct_option_index)
+            except (TypeError, ValueError):
+                db.session.delete(question)
+                continue
+
+            if correct_option_index < 0 or correct_option_index >= len(options):
+                db.session.delete(question)
+                continue
+
+            for idx, option_text in enumerate(options):
+                option_text = str(option_text).strip()
+                if not option_text:
+                    option_text = f'Option {idx + 1}'
+                db.session.add(Option(
+                    question_id=question.id,
+                    option_text=option_text,
+                    is_correct=(idx == correct_option_index)
+                ))
+
+        elif question_type in ['true_false', 'short_answer']:
+            correct_answer = str(item.get('correct_answer', '')).strip()
+            if question_type == 'true_false' and correct_answer not in ['True', 'False']:
+                db.session.delete(question)
+                continue
+            if not correct_answer:
+                db.session.delete(question)
+                continue
+            question.correct_answer = correct_answer
+
+        batch_index.add(question.id, quiz_id, question_text)
+        saved_questions.append(question)
+
+    if not saved_questions:
+        db.session.rollback()
+        return 0, duplicate_count
+
+    if before_commit is not None and not before_commit(len(saved_questions), duplicate_count):
+        db.session.rollback()
+        raise ValueError('Generation already finished or timed out; questions were not saved')
+
+    db.session.commit()
+    invalidate_answer_key(quiz_id)
+    index_questions(teacher_id, saved_questions)
+    return len(saved_questions), duplicate_count
+
+
+@job_handler('generate_questions')
+def run_generation_job(params, report, job_id):
+    """Background job: generate questions, then either save them or keep them for review"""
+    generation = params['generation']
+    reported = set()
+    report_lock = threading.Lock()
+
+    def on_question(question):
+        # Chunks stream concurrently; publish each distinct question once for the live preview
+        fingerprint = question_fingerprint(question)
+        with report_lock:
+            if not fingerprint or fingerprint in reported:
+                return
+            reported.add(fingerprint)
+        report(question)
+
+    # Large requests are split into concurrent chunks; failed chunks don't fail the whole job
+    generated = generate_in_chunks(
+        app, generate_questions_with_openrouter, on_question=on_question, **generation
+    )
+    generated_questions = generated['questions']
+
+    if params.get('auto_save'):
+        def saved_result(saved_count, duplicate_count):
+            return {
+                'saved_count': saved_count,
+                'duplicate_count': duplicate_count,
+                'failed_chunks': generated['failed_chunks']
+            }
+
+        # The job is marked succeeded in the same transaction, so a job that timed out meanwhile saves nothing
+        saved_count, duplicate_count = save_generated_questions(
+            params['quiz_id'], generation['question_type'], generation['marks'], generated_questions,
+            before_commit=lambda saved, duplicates: complete_job(job_id, saved_result(saved, duplicates))
+        )
+        if saved_count == 0:
+            if duplicate_count:
+                raise ValueError('All generated questions duplicate questions you already have')
+            raise ValueError('AI response received, but no valid questions could be saved')
+        return saved_result(saved_count, duplicate_count)
+
+    return {'questions': generated_questions, 'failed_chunks': generated['failed_chunks']}
+
+
+def enqueue_generation(quiz_id, generation, auto_save=False):
+    """Queue an AI generation job for the current teacher; returns None if too many are pending"""
+    active = count_active_jobs(session['user_id'], app.config.get('OPENROUTER_HARD_TIMEOUT_SECONDS', 40))
+    if active >= app.config.get('JOB_MAX_PENDING_PER_USER', 3):
+        return None
+    return enqueue_job('generate_questions', session['user_id'], {
+        'quiz_id': quiz_id,
+        'auto_save': auto_save,
+        'generation': generation
+    })
 
 # -------------------
 # DECORATORS
@@ -176,8 +351,9 @@ def role_required(role_name):
                 flash('Please login first', 'warning')
                 return redirect(url_for('login'))
             
-            user = User.query.get(session['user_id'])
-            if not user or user.get_role_name() != role_name:
+            # Role comes from the identity cache, so the hot path runs no queries
+            role = get_user_role(session['user_id'], app.config.get('IDENTITY_CACHE_TTL_SECONDS', 300))
+            if role != role_name:
                 flash('Access denied', 'danger')
                 return redirect(url_for('login'))
             return f(*args, **kwargs)
@@ -190,8 +366,7 @@ def role_required(role_name):
 @app.route('/')
 def index():
     if 'user_id' in session:
-        user = User.query.get(session['user_id'])
-        role = user.get_role_name()
+        role = get_user_role(session['user_id'], app.config.get('IDENTITY_CACHE_TTL_SECONDS', 300))
         if role == "Admin":
             return redirect(url_for('admin_dashboard'))
         elif role == "Teacher":
@@ -236,6 +411,7 @@ def register():
             new_user.roles.append(role)
             db.session.add(new_user)
             db.session.commit()
+            record_user_added(role_name)
 
             flash('Registration successful! Please login.', 'success')
             return redirect(url_for('login'))
@@ -265,6 +441,7 @@ def login():
             session['user_id'] = user.id
             session['username'] = user.username
             role = user.get_role_name()
+            remember_user_role(user.id, role, app.config.get('IDENTITY_CACHE_TTL_SECONDS', 300))
 
             flash(f'Welcome {user.username}!', 'success')
 
@@ -286,25 +463,36 @@ def login():
 @app.route('/admin/dashboard')
 @role_required('Admin')
 def admin_dashboard():
-    total_users = User.query.count() - 1  # Exclude admin
-    total_teachers = db.session.query(User).join(User.roles).filter(Role.rolename == 'Teacher').count()
-    total_students = db.session.query(User).join(User.roles).filter(Role.rolename == 'Student').count()
-    total_quizzes = Quiz.query.count()
-    
-    users = User.query.all()
+    # Counters come from the statistics service; users and their roles load one page at a time
+    stats = get_platform_stats(app.config.get('PLATFORM_STATS_TTL_SECONDS', 60))
+    users, next_after = users_page(page_size=app.config.get('ADMIN_USERS_PAGE_SIZE', 100))
     
     return render_template('admin_dashboard.html', 
-                         total_users=total_users,
-                         total_teachers=total_teachers,
-                         total_students=total_students,
-                         total_quizzes=total_quizzes,
-                         users=users)
+                         total_users=stats['total_users'],
+                         total_teachers=stats['total_teachers'],
+                         total_students=stats['total_students'],
+                         total_quizzes=stats['total_quizzes'],
+                         users=users,
+                         next_after=next_after)
 
 @app.route('/admin/users')
 @role_required('Admin')
 def admin_users():
-    users = User.query.all()
-    return render_template('admin_users.html', users=users)
+    after = request.args.get('after', type=int)
+    users, next_after = users_page(after, app.config.get('ADMIN_USERS_PAGE_SIZE', 100))
+    return render_template('admin_users.html', users=users, after=after, next_after=next_after)
+
+@app.route('/admin/metrics')
+def admin_metrics():
+    """Instrumentation in Prometheus text format, for admins or a scraper holding METRICS_SCRAPE_TOKEN"""
+    token = app.config.get('METRICS_SCRAPE_TOKEN')
+    authorized = bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not authorized and 'user_id' in session:
+        authorized = get_user_role(session['user_id'], app.config.get('IDENTITY_CACHE_TTL_SECONDS', 300)) == 'Admin'
+    if not authorized:
+        return Response('Forbidden\n', status=403, mimetype='text/plain')
+    
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
 
 @app.route('/admin/delete-user/<int:user_id>', methods=['POST'])
 @role_required('Admin')
@@ -314,8 +502,12 @@ def delete_user(user_id):
         return redirect(url_for('admin_users'))
     
     user = User.query.get_or_404(user_id)
+    role_name = user.get_role_name()
     db.session.delete(user)
     db.session.commit()
+    record_user_deleted(role_name)
+    invalidate_user_role(user_id)
+    drop_teacher_index(user_id)
     flash(f'User {user.username} deleted successfully', 'success')
     return redirect(url_for('admin_users'))
 
@@ -325,10 +517,10 @@ def delete_user(user_id):
 @app.route('/teacher/dashboard')
 @role_required('Teacher')
 def teacher_dashboard():
-    teacher = User.query.get(session['user_id'])
-    quizzes = Quiz.query.filter_by(teacher_id=teacher.id).all()
+    # One grouped query: per-quiz question/submission counts and average score, no Question rows loaded
+    quizzes = teacher_quiz_summaries(session['user_id'])
     total_quizzes = len(quizzes)
-    total_questions = sum(len(quiz.questions) for quiz in quizzes)
+    total_questions = sum(question_count for _, question_count, _, _ in quizzes)
     
     return render_template('teacher_dashboard.html', 
                          quizzes=quizzes,
@@ -357,6 +549,7 @@ def create_quiz():
         )
         db.session.add(quiz)
         db.session.commit()
+        record_quiz_added()
         
         flash('Quiz created successfully!', 'success')
         return redirect(url_for('edit_quiz', quiz_id=quiz.id))
@@ -378,6 +571,7 @@ def edit_quiz(quiz_id):
         quiz.duration_minutes = int(request.form.get('duration_minutes', 30))
         quiz.total_marks = int(request.form.get('total_marks', 100))
         db.session.commit()
+        invalidate_answer_key(quiz.id)
         flash('Quiz updated successfully!', 'success')
         return redirect(url_for('edit_quiz', quiz_id=quiz.id))
     
@@ -393,69 +587,93 @@ def add_question(quiz_id):
         return redirect(url_for('teacher_dashboard'))
     
     if request.method == 'POST':
-        question_text = request.form.get('question_text')
-        question_type = request.form.get('question_type')
-        marks = int(request.form.get('marks', 1))
-        
-        if not question_text or not question_type:
-            flash('Question text and type are required', 'danger')
+        try:
+            validated = validate_question(
+                request.form.get('question_text'),
+                request.form.get('question_type'),
+                request.form.get('marks', 1),
+                options=request.form.getlist('option'),
+                correct_option=request.form.get('correct_option'),
+                correct_answer=request.form.get('correct_answer')
+            )
+        except ValueError as e:
+            flash(str(e), 'danger')
             return redirect(url_for('add_question', quiz_id=quiz_id))
         
-        question = Question(
-            quiz_id=quiz_id,
-            question_text=question_text,
-            question_type=question_type,
-            marks=marks
-        )
+        question = Question(quiz_id=quiz_id, **validated['question'])
+        for option in validated['options']:
+            db.session.add(Option(question=question, **option))
         
-        if question_type == 'mcq':
-            options = request.form.getlist('option')
-            correct_option = request.form.get('correct_option')
-            
-            if len(options) < 2:
-                flash('At least 2 options required for MCQ', 'danger')
-                return redirect(url_for('add_question', quiz_id=quiz_id))
-            
-            # Validate that a correct option was selected
-            if not correct_option:
-                flash('Please select which option is correct!', 'danger')
-                return redirect(url_for('add_question', quiz_id=quiz_id))
-            
-            if not correct_option.isdigit() or int(correct_option) >= len(options):
-                flash('Invalid correct option selection', 'danger')
-                return redirect(url_for('add_question', quiz_id=quiz_id))
-            
-            correct_option_idx = int(correct_option)
-            for i, option_text in enumerate(options):
-                option = Option(
-                    question=question,
-                    option_text=option_text,
-                    is_correct=(i == correct_option_idx)
-                )
-                db.session.add(option)
-        
-        elif question_type == 'true_false':
-            correct_answer = request.form.get('correct_answer')
-            if not correct_answer or correct_answer not in ['True', 'False']:
-                flash('Please select a valid correct answer (True or False)', 'danger')
-                return redirect(url_for('add_question', quiz_id=quiz_id))
-            question.correct_answer = correct_answer
-            
-        elif question_type == 'short_answer':
-            correct_answer = request.form.get('correct_answer', '').strip()
-            if not correct_answer:
-                flash('Please provide a correct answer for the short answer question', 'danger')
-                return redirect(url_for('add_question', quiz_id=quiz_id))
-            question.correct_answer = correct_answer
+        duplicate = find_duplicate(
+            quiz.teacher_id, question.question_text, app.config.get('DUPLICATE_SIMILARITY_THRESHOLD', 0.8)
+        )
         
         db.session.add(question)
         db.session.commit()
+        invalidate_answer_key(quiz_id)
+        index_questions(quiz.teacher_id, [question])
+        if duplicate:
+            flash(f'This question looks like a duplicate of an existing one: "{duplicate["question_text"]}"', 'warning')
         flash('Question added successfully!', 'success')
         return redirect(url_for('edit_quiz', quiz_id=quiz_id))
     
     return render_template('add_question.html', quiz=quiz)
 
 
+@app.route('/teacher/quiz/<int:quiz_id>/import-questions', methods=['GET', 'POST'])
+@role_required('Teacher')
+def import_questions_page(quiz_id):
+    """Bulk-import questions from a CSV or JSON file; nothing is saved unless every row is valid"""
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        flash('You do not have permission', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+    
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Please choose a CSV or JSON file', 'danger')
+            return render_template('import_questions.html', quiz=quiz)
+        
+        try:
+            rows = parse_import_file(upload.filename, upload.read())
+        except ValueError as e:
+            flash(str(e), 'danger')
+            return render_template('import_questions.html', quiz=quiz)
+        
+        max_rows = app.config.get('IMPORT_MAX_ROWS', 5000)
+        if not rows or len(rows) > max_rows:
+            flash(f'The file must contain between 1 and {max_rows} questions', 'danger')
+            return render_template('import_questions.html', quiz=quiz)
+        
+        validated, errors = validate_rows(rows)
+        if errors:
+            flash(f'{len(errors)} row(s) have errors; no questions were imported.', 'danger')
+            return render_template('import_questions.html', quiz=quiz, errors=errors, row_count=len(rows))
+        
+        threshold = app.config.get('DUPLICATE_SIMILARITY_THRESHOLD', 0.8)
+        duplicate_count = sum(
+            1 for item in validated if find_duplicate(quiz.teacher_id, item['question']['question_text'], threshold)
+        )
+        
+        try:
+            inserted = import_questions(quiz_id, validated)
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error importing questions: {str(e)}', 'danger')
+            return render_template('import_questions.html', quiz=quiz)
+        
+        invalidate_answer_key(quiz_id)
+        index_questions(quiz.teacher_id, inserted)
+        if duplicate_count:
+            flash(f'{duplicate_count} imported question(s) look like duplicates of existing ones.', 'warning')
+        flash(f'Imported {len(inserted)} questions!', 'success')
+        return redirect(url_for('edit_quiz', quiz_id=quiz_id))
+    
+    return render_template('import_questions.html', quiz=quiz)
+
+
 @app.route('/teacher/quiz/<int:quiz_id>/generate-questions-direct', methods=['POST'])
 @role_required('Teacher')
 def generate_questions(quiz_id):
@@ -504,91 +722,23 @@ def generate_questions(quiz_id):
         flash('Question count must be between 1 and 20', 'danger')
         return redirect(url_for('add_question', quiz_id=quiz_id))
 
-    try:
-        generated_questions = generate_questions_with_hard_timeout(
-            topic=topic,
-            question_type=question_type,
-            count=count,
-            marks=marks,
-            difficulty=difficulty,
-            syllabus_scope=syllabus_scope,
-            output_language=output_language
-        )
-
-        saved_count = 0
-        for item in generated_questions:
-            question_text = str(item.get('question_text', '')).strip()
-            q_marks = item.get('marks', marks)
-            try:
-                q_marks = int(q_marks)
-            except (TypeError, ValueError):
-                q_marks = marks
-
-            if not question_text:
-                continue
-
-            question = Question(
-                quiz_id=quiz_id,
-                question_text=question_text,
-                question_type=question_type,
-                marks=max(1, q_marks)
-            )
-            db.session.add(question)
-            db.session.flush()
-
-            if question_type == 'mcq':
-                options = item.get('options', [])
-                correct_option_index = item.get('correct_option_index')
-                if not isinstance(options, list) or len(options) < 2:
-                    db.session.delete(question)
-                    continue
-
-                try:
-                    correct_option_index = int(correct_option_index)
-                except (TypeError, ValueError):
-                    db.session.delete(question)
-                    continue
-
-                if correct_option_index < 0 or correct_option_index >= len(options):
-                    db.session.delete(question)
-                    continue
-
-                for idx, option_text in enumerate(options):
-                    option_text = str(option_text).strip()
-                    if not option_text:
-                        option_text = f'Option {idx + 1}'
-                    db.session.add(Option(
-                        question_id=question.id,
-                        option_text=option_text,
-                        is_correct=(idx == correct_option_index)
-                    ))
-
-            elif question_type in ['true_false', 'short_answer']:
-                correct_answer = str(item.get('correct_answer', '')).strip()
-                if question_type == 'true_false' and correct_answer not in ['True', 'False']:
-                    db.session.delete(question)
-                    continue
-                if not correct_answer:
-                    db.session.delete(question)
-                    continue
-                question.correct_answer = correct_answer
-
-            saved_count += 1
-
-        if saved_count == 0:
-            db.session.rollback()
-            flash('AI response received, but no valid questions could be saved', 'warning')
-            return redirect(url_for('add_question', quiz_id=quiz_id))
-
-        db.session.commit()
-        flash(f'{saved_count} AI-generated question(s) added successfully!', 'success')
-        return redirect(url_for('edit_quiz', quiz_id=quiz_id))
-
-    except Exception as e:
-        db.session.rollback()
-        flash(f'Failed to generate questions: {str(e)}', 'danger')
+    job_id = enqueue_generation(quiz_id, {
+        'topic': topic,
+        'question_type': question_type,
+        'count': count,
+        'marks': marks,
+        'difficulty': difficulty,
+        'syllabus_scope': syllabus_scope,
+        'output_language': output_language,
+        'force_fresh': bool(request.form.get('force_fresh'))
+    }, auto_save=True)
+
+    if not job_id:
+        flash('You already have AI generations in progress. Please wait for them to finish.', 'warning')
         return redirect(url_for('add_question', quiz_id=quiz_id))
 
+    return redirect(url_for('generate_questions_page', quiz_id=quiz_id, job_id=job_id))
+
 @app.route('/teacher/quiz/<int:quiz_id>/publish', methods=['POST'])
 @role_required('Teacher')
 def publish_quiz(quiz_id):
@@ -604,6 +754,7 @@ def publish_quiz(quiz_id):
     
     quiz.is_published = True
     db.session.commit()
+    invalidate_answer_key(quiz_id)
     flash('Quiz published successfully!', 'success')
     return redirect(url_for('teacher_dashboard'))
 
@@ -616,8 +767,154 @@ def quiz_results(quiz_id):
         flash('Permission denied', 'danger')
         return redirect(url_for('teacher_dashboard'))
     
-    submissions = QuizSubmission.query.filter_by(quiz_id=quiz_id).all()
-    return render_template('quiz_results.html', quiz=quiz, submissions=submissions)
+    submissions = QuizSubmission.query.options(joinedload(QuizSubmission.student)).filter_by(quiz_id=quiz_id).all()
+    analysis = get_item_analysis(quiz_id)
+    return render_template('quiz_results.html', quiz=quiz, submissions=submissions, analysis=analysis,
+                         parquet_available=parquet_available())
+
+@app.route('/teacher/quiz/<int:quiz_id>/export/<kind>.<export_format>')
+@role_required('Teacher')
+def export_quiz_results(quiz_id, kind, export_format):
+    """Stream submissions or answers as CSV/Parquet without building the file in memory"""
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        flash('Permission denied', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+    
+    if kind not in EXPORT_KINDS or export_format not in EXPORT_FORMATS:
+        return render_template('404.html'), 404
+    
+    if export_format == 'parquet' and not parquet_available():
+        flash('Parquet export requires the pyarrow package', 'danger')
+        return redirect(url_for('quiz_results', quiz_id=quiz_id))
+    
+    rows = stream_csv(kind, quiz_id) if export_format == 'csv' else stream_parquet(kind, quiz_id)
+    filename = f'quiz_{quiz_id}_{kind}.{export_format}'
+    return Response(stream_with_context(rows), mimetype=EXPORT_FORMATS[export_format],
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/teacher/quiz/<int:quiz_id>/analysis')
+@role_required('Teacher')
+def quiz_item_analysis(quiz_id):
+    """Item analysis as JSON: score histogram, per-question statistics and reliability"""
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        return jsonify({'error': 'Permission denied'}), 403
+    
+    return jsonify(get_item_analysis(quiz_id))
+
+@app.route('/teacher/quiz/<int:quiz_id>/regrade', methods=['POST'])
+@role_required('Teacher')
+def regrade_quiz_results(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        flash('Permission denied', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+    
+    try:
+        summary = regrade_quiz(quiz_id)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Failed to regrade quiz: {str(e)}', 'danger')
+        return redirect(url_for('quiz_results', quiz_id=quiz_id))
+    
+    flash(
+        f"Regraded {summary['answers']} answer(s): "
+        f"{summary['answers_updated']} answer(s) and {summary['submissions_updated']} score(s) changed",
+        'success'
+    )
+    return redirect(url_for('quiz_results', quiz_id=quiz_id))
+
+def auto_grade_quiz(quiz_id):
+    return grade_short_answers(
+        quiz_id,
+        accept_threshold=app.config.get('SHORT_ANSWER_ACCEPT_THRESHOLD', 0.85),
+        review_threshold=app.config.get('SHORT_ANSWER_REVIEW_THRESHOLD', 0.6),
+        numeric_tolerance=app.config.get('SHORT_ANSWER_NUMERIC_TOLERANCE', 0.01)
+    )
+
+@app.route('/teacher/quiz/<int:quiz_id>/auto-grade', methods=['POST'])
+@role_required('Teacher')
+def auto_grade_quiz_results(quiz_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        flash('Permission denied', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+    
+    try:
+        summary = auto_grade_quiz(quiz_id)
+    except Exception as e:
+        db.session.rollback()
+        flash(f'Failed to auto-grade short answers: {str(e)}', 'danger')
+        return redirect(url_for('quiz_results', quiz_id=quiz_id))
+    
+    flash(
+        f"Auto-graded {summary['answers']} short answer(s): {summary['accepted']} accepted, "
+        f"{summary['review']} flagged for review, {summary['rejected']} rejected; "
+        f"{summary['submissions_updated']} score(s) updated",
+        'success'
+    )
+    return redirect(url_for('quiz_results', quiz_id=quiz_id))
+
+@app.route('/teacher/quiz/<int:quiz_id>/grading')
+@role_required('Teacher')
+def grading_queue_page(quiz_id):
+    """Short answers grouped by question and normalized text, pending ones first"""
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        flash('Permission denied', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+    
+    include_graded = request.args.get('show') == 'all'
+    groups = grading_queue(quiz_id, include_graded=include_graded)
+    return render_template('grading_queue.html', quiz=quiz, groups=groups, include_graded=include_graded)
+
+@app.route('/teacher/quiz/<int:quiz_id>/grading/<int:question_id>', methods=['POST'])
+@role_required('Teacher')
+def grade_answer_clusters(quiz_id, question_id):
+    quiz = Quiz.query.get_or_404(quiz_id)
+    
+    if quiz.teacher_id != session['user_id']:
+        flash('Permission denied', 'danger')
+        return redirect(url_for('teacher_dashboard'))
+    
+    queue_url = url_for('grading_queue_page', quiz_id=quiz_id, show=request.form.get('show') or None)
+    queue_url += f'#question-{question_id}'
+    
+    # One marks field per answer cluster; blank fields are left ungraded
+    awards = {}
+    for key, value in zip(request.form.getlist('cluster_key'), request.form.getlist('cluster_marks')):
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            awards[key] = float(value)
+        except ValueError:
+            flash('Marks must be numbers', 'danger')
+            return redirect(queue_url)
+    
+    if not awards:
+        flash('Enter marks for at least one answer group', 'warning')
+        return redirect(queue_url)
+    
+    try:
+        summary = grade_clusters(quiz_id, question_id, awards)
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), 'danger')
+        return redirect(queue_url)
+    
+    flash(
+        f"Graded {summary['answers_updated']} answer(s) in {summary['clusters']} group(s); "
+        f"{summary['submissions_updated']} score(s) updated",
+        'success'
+    )
+    return redirect(queue_url)
 
 @app.route('/teacher/quiz/<int:quiz_id>/delete', methods=['POST'])
 @role_required('Teacher')
@@ -630,6 +927,9 @@ def delete_quiz(quiz_id):
     
     db.session.delete(quiz)
     db.session.commit()
+    record_quiz_deleted()
+    invalidate_answer_key(quiz_id)
+    unindex_quiz(quiz.teacher_id, quiz_id)
     flash('Quiz deleted successfully!', 'success')
     return redirect(url_for('teacher_dashboard'))
 
@@ -646,6 +946,8 @@ def delete_question(question_id):
     
     db.session.delete(question)
     db.session.commit()
+    invalidate_answer_key(quiz_id)
+    unindex_question(quiz.teacher_id, question_id)
     flash('Question deleted successfully!', 'success')
     return redirect(url_for('edit_quiz', quiz_id=quiz_id))
 
@@ -655,16 +957,21 @@ def delete_question(question_id):
 @app.route('/student/dashboard')
 @role_required('Student')
 def student_dashboard():
-    student = User.query.get(session['user_id'])
-    available_quizzes = Quiz.query.filter_by(is_published=True).all()
-    completed_quizzes = QuizSubmission.query.filter_by(student_id=student.id).all()
-    completed_quiz_ids = [sub.quiz_id for sub in completed_quizzes]
+    page_size = app.config.get('DASHBOARD_PAGE_SIZE', 20)
+    pending_before = request.args.get('pending_before', type=int)
+    completed_before = request.args.get('completed_before', type=int)
     
-    pending_quizzes = [q for q in available_quizzes if q.id not in completed_quiz_ids]
+    # Pending quizzes come from an anti-join in SQL; both lists are keyset-paginated
+    pending_quizzes, pending_next = pending_quizzes_page(session['user_id'], pending_before, page_size)
+    completed_quizzes, completed_next = completed_submissions_page(session['user_id'], completed_before, page_size)
     
     return render_template('student_dashboard.html', 
                          pending_quizzes=pending_quizzes,
-                         completed_quizzes=completed_quizzes)
+                         completed_quizzes=completed_quizzes,
+                         pending_before=pending_before,
+                         pending_next=pending_next,
+                         completed_before=completed_before,
+                         completed_next=completed_next)
 
 @app.route('/student/quiz/<int:quiz_id>/start')
 @role_required('Student')
@@ -685,12 +992,48 @@ def start_quiz(quiz_id):
         flash('You have already submitted this quiz', 'warning')
         return redirect(url_for('student_dashboard'))
     
-    return render_template('take_quiz.html', quiz=quiz)
+    questions_html, question_count = render_quiz_questions(quiz)
+    return render_template('take_quiz.html',
+                         quiz=quiz,
+                         questions_html=questions_html,
+                         question_count=question_count,
+                         draft=get_draft(quiz_id, session['user_id']))
+
+@app.route('/student/quiz/<int:quiz_id>/autosave', methods=['POST'])
+@role_required('Student')
+def autosave_quiz(quiz_id):
+    """
+    Buffer changed answers of an in-progress attempt; JSON body {"answers": {"question_<id>": value}}
+    """
+    data = request.get_json(silent=True)
+    changes = data.get('answers') if isinstance(data, dict) else None
+    if not isinstance(changes, dict) or not changes:
+        return jsonify({'error': 'Expected {"answers": {...}} with at least one answer'}), 400
+    
+    # Same checks as start_quiz, so drafts only exist for attempts a student can actually take
+    quiz = Quiz.query.get_or_404(quiz_id)
+    if not quiz.is_published:
+        return jsonify({'error': 'This quiz is not available'}), 404
+    submitted = db.session.query(QuizSubmission.id).filter_by(
+        quiz_id=quiz_id, student_id=session['user_id']
+    ).first()
+    if submitted:
+        return jsonify({'error': 'Quiz already submitted'}), 409
+    
+    allowed_fields = {f"question_{entry['question_id']}" for entry in get_answer_key(quiz_id).entries}
+    try:
+        saved = record_draft_answers(quiz_id, session['user_id'], changes, allowed_fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if not saved:
+        return jsonify({'error': 'Quiz already submitted'}), 409
+    return jsonify({'saved': len(changes)})
 
 @app.route('/student/quiz/<int:quiz_id>/submit', methods=['POST'])
 @role_required('Student')
 def submit_quiz(quiz_id):
-    quiz = Quiz.query.get_or_404(quiz_id)
+    Quiz.query.get_or_404(quiz_id)
     student_id = session['user_id']
     
     # Check for duplicate submission
@@ -699,83 +1042,24 @@ def submit_quiz(quiz_id):
         flash('Quiz already submitted', 'warning')
         return redirect(url_for('student_dashboard'))
     
-    # Calculate score
-    score = 0
-    total_marks = 0
+    # Autosaved answers fill in anything the form didn't post; posted answers win
+    responses = get_draft(quiz_id, student_id)
+    responses.update(request.form.items())
     
-    for question in quiz.questions:
-        total_marks += question.marks
-        answer_key = f'question_{question.id}'
-        
-        if question.question_type == 'mcq':
-            selected_option_id = request.form.get(answer_key)
-            if selected_option_id:
-                option = Option.query.get(selected_option_id)
-                is_correct = option.is_correct if option else False
-                marks = question.marks if is_correct else 0
-                score += marks
-                
-                student_answer = StudentAnswer(
-                    quiz_id=quiz_id,
-                    question_id=question.id,
-                    student_id=student_id,
-                    selected_option_id=selected_option_id,
-                    is_correct=is_correct,
-                    marks_obtained=marks
-                )
-                db.session.add(student_answer)
-        
-        elif question.question_type == 'true_false':
-            answer = request.form.get(answer_key)
-            
-            # Validate we have both answer and correct_answer
-            if not answer or not question.correct_answer:
-                marks = 0
-                is_correct = False
-            else:
-                # Strip and normalize whitespace for comparison
-                answer_clean = answer.strip()
-                correct_answer_clean = question.correct_answer.strip()
-                # Case-sensitive comparison for True/False (they should be exactly "True" or "False")
-                is_correct = (answer_clean == correct_answer_clean)
-                marks = question.marks if is_correct else 0
-            
-            score += marks
-            
-            student_answer = StudentAnswer(
-                quiz_id=quiz_id,
-                question_id=question.id,
-                student_id=student_id,
-                answer_text=answer,
-                is_correct=is_correct,
-                marks_obtained=marks
-            )
-            db.session.add(student_answer)
-        
-        elif question.question_type == 'short_answer':
-            answer = request.form.get(answer_key)
-            # Short answers are manually graded (teacher can mark later)
-            # For now, set is_correct to False (pending manual grading)
-            student_answer = StudentAnswer(
-                quiz_id=quiz_id,
-                question_id=question.id,
-                student_id=student_id,
-                answer_text=answer,
-                is_correct=False,
-                marks_obtained=0
-            )
-            db.session.add(student_answer)
+    # Grade in memory against the compiled answer key
+    score, total_marks, answers = grade_answers(get_answer_key(quiz_id), responses)
     
-    # Create submission record
-    submission = QuizSubmission(
-        quiz_id=quiz_id,
-        student_id=student_id,
-        score=score,
-        total_marks=total_marks
-    )
-    db.session.add(submission)
-    db.session.commit()
+    # Write the submission and all answers in one short transaction
+    try:
+        save_submission(quiz_id, student_id, score, total_marks, answers)
+    except IntegrityError:
+        # A concurrent request already stored this student's submission
+        db.session.rollback()
+        discard_draft(quiz_id, student_id)
+        flash('Quiz already submitted', 'warning')
+        return redirect(url_for('student_dashboard'))
     
+    discard_draft(quiz_id, student_id)
     flash(f'Quiz submitted! Your score: {score}/{total_marks}', 'success')
     return redirect(url_for('student_dashboard'))
 
@@ -844,30 +1128,23 @@ def generate_questions_page(quiz_id):
                     flash('Marks per question should be 1-10', 'danger')
                     return render_template('generate_questions.html', quiz=quiz, step='count', topic=topic)
                 
-                # Generate questions using OpenRouter API
-                generated_questions = generate_questions_with_hard_timeout(
-                    topic=topic,
-                    question_type='mcq',
-                    count=num_questions,
-                    marks=marks_per_question,
-                    difficulty=difficulty,
-                    syllabus_scope=syllabus_scope,
-                    output_language=output_language
-                )
+                # Generate questions in the background; the pending page polls for the result
+                job_id = enqueue_generation(quiz_id, {
+                    'topic': topic,
+                    'question_type': 'mcq',
+                    'count': num_questions,
+                    'marks': marks_per_question,
+                    'difficulty': difficulty,
+                    'syllabus_scope': syllabus_scope,
+                    'output_language': output_language,
+                    'force_fresh': bool(request.form.get('force_fresh'))
+                })
                 
-                if not generated_questions:
-                    flash('Failed to generate questions', 'danger')
+                if not job_id:
+                    flash('You already have AI generations in progress. Please wait for them to finish.', 'warning')
                     return render_template('generate_questions.html', quiz=quiz, step='count', topic=topic)
                 
-                return render_template('generate_questions.html', 
-                                     quiz=quiz, 
-                                     step='review', 
-                                     topic=topic,
-                                     questions=generated_questions,
-                                     marks=marks_per_question,
-                                     difficulty=difficulty,
-                                     output_language=output_language,
-                                     syllabus_scope=syllabus_scope)
+                return redirect(url_for('generate_questions_page', quiz_id=quiz_id, job_id=job_id))
                 
             except ValueError as e:
                 flash(f'Error: {str(e)}', 'danger')
@@ -876,9 +1153,119 @@ def generate_questions_page(quiz_id):
                 flash(f'Error generating questions: {str(e)}', 'danger')
                 return render_template('generate_questions.html', quiz=quiz, step='count', topic=topic)
     
+    job_id = request.args.get('job_id')
+    if job_id:
+        return generation_job_page(quiz, job_id)
+    
     return render_template('generate_questions.html', quiz=quiz, step='topic')
 
 
+def flag_duplicates(teacher_id, questions):
+    """
+    Find near-duplicates of generated questions for the review page
+
+    Returns:
+        List aligned with questions: None, or the matching question's text and quiz title
+    """
+    threshold = app.config.get('DUPLICATE_SIMILARITY_THRESHOLD', 0.8)
+    matches = [find_duplicate(teacher_id, q.get('question_text', ''), threshold) for q in questions]
+    
+    quiz_ids = {match['quiz_id'] for match in matches if match}
+    titles = dict(db.session.query(Quiz.id, Quiz.title).filter(Quiz.id.in_(quiz_ids))) if quiz_ids else {}
+    return [
+        {'question_text': match['question_text'], 'quiz_title': titles.get(match['quiz_id'], '')} if match else None
+        for match in matches
+    ]
+
+
+def generation_job_page(quiz, job_id):
+    """Render a generation job: pending (polling), review, or the outcome of an auto-save job"""
+    job = get_job(job_id, app.config.get('OPENROUTER_HARD_TIMEOUT_SECONDS', 40))
+    if not job or job.owner_id != session['user_id'] or job_params(job).get('quiz_id') != quiz.id:
+        flash('Generation job not found', 'danger')
+        return redirect(url_for('generate_questions_page', quiz_id=quiz.id))
+    
+    params = job_params(job)
+    generation = params['generation']
+    
+    if job.status in ('queued', 'running'):
+        return render_template('generate_questions.html', quiz=quiz, step='pending',
+                             job_id=job.id, topic=generation['topic'])
+    
+    if job.status == 'failed':
+        if params.get('auto_save'):
+            flash(f'Failed to generate questions: {job.error}', 'danger')
+            return redirect(url_for('add_question', quiz_id=quiz.id))
+        flash(f'Error: {job.error}', 'danger')
+        return render_template('generate_questions.html', quiz=quiz, step='count', topic=generation['topic'])
+    
+    result = job_result(job) or {}
+    if result.get('failed_chunks'):
+        flash('Some parts of the AI generation failed, so fewer questions than requested were generated.', 'warning')
+    if params.get('auto_save'):
+        if result.get('duplicate_count'):
+            flash(f"Skipped {result['duplicate_count']} question(s) that duplicate existing ones.", 'info')
+        flash(f"{result.get('saved_count', 0)} AI-generated question(s) added successfully!", 'success')
+        return redirect(url_for('edit_quiz', quiz_id=quiz.id))
+    
+    questions = result.get('questions', [])
+    duplicates = flag_duplicates(quiz.teacher_id, questions)
+    
+    return render_template('generate_questions.html', 
+                         quiz=quiz, 
+                         step='review', 
+                         topic=generation['topic'],
+                         questions=questions,
+                         duplicates=duplicates,
+                         marks=generation['marks'],
+                         difficulty=generation['difficulty'],
+                         output_language=generation['output_language'],
+                         syllabus_scope=generation['syllabus_scope'])
+
+
+@app.route('/teacher/generation-jobs/<job_id>/events')
+@role_required('Teacher')
+def generation_job_events(job_id):
+    """Server-sent events: one 'question' event per generated question, then 'done'"""
+    hard_timeout = app.config.get('OPENROUTER_HARD_TIMEOUT_SECONDS', 40)
+    job = get_job(job_id, hard_timeout)
+    if not job or job.owner_id != session['user_id']:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def events():
+        sent = 0
+        deadline = time.monotonic() + hard_timeout + 10
+        while time.monotonic() < deadline:
+            items, finished = wait_for_progress(job_id, sent, timeout=1.0)
+            for item in items:
+                yield f"event: question\ndata: {json.dumps(item)}\n\n"
+            sent += len(items)
+            if finished:
+                break
+            if finished is None:
+                # Not running in this process: fall back to the stored job status
+                db.session.expire_all()
+                current = get_job(job_id, hard_timeout)
+                if not current or current.status not in ('queued', 'running'):
+                    break
+            yield ": keep-alive\n\n"
+        yield "event: done\ndata: {}\n\n"
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/teacher/generation-jobs/<job_id>')
+@role_required('Teacher')
+def generation_job_status(job_id):
+    """Polled by the pending page"""
+    job = get_job(job_id, app.config.get('OPENROUTER_HARD_TIMEOUT_SECONDS', 40))
+    if not job or job.owner_id != session['user_id']:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({'id': job.id, 'status': job.status, 'error': job.error})
+
+
 @app.route('/teacher/quiz/<int:quiz_id>/add-generated-questions', methods=['POST'])
 @role_required('Teacher')
 def add_generated_questions(quiz_id):
@@ -896,12 +1283,20 @@ def add_generated_questions(quiz_id):
             flash('No questions selected', 'warning')
             return redirect(url_for('generate_questions_page', quiz_id=quiz_id))
         
-        added_count = 0
+        threshold = app.config.get('DUPLICATE_SIMILARITY_THRESHOLD', 0.8)
+        batch_index = SimilarityIndex()
+        added_questions = []
+        skipped_count = 0
         for q_data in questions_data:
+            question_text = q_data.get('question_text')
+            if find_duplicate(quiz.teacher_id, question_text, threshold) or batch_index.find(question_text, threshold):
+                skipped_count += 1
+                continue
+            
             # Create question
             question = Question(
                 quiz_id=quiz_id,
-                question_text=q_data.get('question_text'),
+                question_text=question_text,
                 question_type='mcq',
                 marks=int(q_data.get('marks', 1))
             )
@@ -920,10 +1315,15 @@ def add_generated_questions(quiz_id):
                 )
                 db.session.add(option)
             
-            added_count += 1
+            batch_index.add(question.id, quiz_id, question_text)
+            added_questions.append(question)
         
         db.session.commit()
-        flash(f'Added {added_count} questions to the quiz!', 'success')
+        invalidate_answer_key(quiz_id)
+        index_questions(quiz.teacher_id, added_questions)
+        if skipped_count:
+            flash(f'Skipped {skipped_count} question(s) that duplicate existing ones.', 'info')
+        flash(f'Added {len(added_questions)} questions to the quiz!', 'success')
         return redirect(url_for('edit_quiz', quiz_id=quiz_id))
         
     except Exception as e:
@@ -940,6 +1340,53 @@ def logout():
     flash('You have been logged out', 'info')
     return redirect(url_for('login'))
 
+# -------------------
+# CLI COMMANDS
+# -------------------
+@app.cli.command('export-results')
+@click.argument('quiz_id', type=int)
+@click.option('--kind', type=click.Choice(sorted(EXPORT_KINDS)), default='submissions', show_default=True)
+@click.option('--format', 'export_format', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--output', type=click.Path(dir_okay=False, writable=True), help='File to write (default: stdout for CSV)')
+def export_results_command(quiz_id, kind, export_format, output):
+    """Stream a quiz's submissions or answers to CSV or Parquet"""
+    if not db.session.get(Quiz, quiz_id):
+        raise click.ClickException(f'Quiz {quiz_id} not found')
+    
+    if export_format == 'csv':
+        target = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+        try:
+            for chunk in stream_csv(kind, quiz_id):
+                target.write(chunk)
+        finally:
+            if output:
+                target.close()
+    else:
+        if not output:
+            raise click.UsageError('--output is required for Parquet')
+        if not parquet_available():
+            raise click.ClickException('Parquet export requires the pyarrow package')
+        with open(output, 'wb') as target:
+            for chunk in stream_parquet(kind, quiz_id):
+                target.write(chunk)
+    
+    if output:
+        click.echo(f'✅ Exported {kind} of quiz {quiz_id} to {output}', err=True)
+
+@app.cli.command('grade-short-answers')
+@click.argument('quiz_id', type=int)
+def grade_short_answers_command(quiz_id):
+    """Auto-grade a quiz's short answers and refresh its submission scores"""
+    if not db.session.get(Quiz, quiz_id):
+        raise click.ClickException(f'Quiz {quiz_id} not found')
+    
+    summary = auto_grade_quiz(quiz_id)
+    click.echo(
+        f"✅ Quiz {quiz_id}: {summary['answers']} short answer(s), {summary['accepted']} accepted, "
+        f"{summary['review']} for review, {summary['rejected']} rejected, "
+        f"{summary['submissions_updated']} score(s) updated"
+    )
+
 # -------------------
 # ERROR HANDLERS
 # -------------------
@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+"""
+Local stand-in for the OpenRouter chat-completions API
+Answers generation prompts with well-formed questions after a configurable delay, optionally
+streams them as server-sent events at a fixed token rate, and injects failures on request:
+rate limiting (429), server errors (500/503), truncated or malformed JSON and hung connections.
+
+Run standalone and point the app at it:
+    python benchmarks/fake_openrouter.py --port 8099 --latency 1.5 --fault 429=0.1 --fault hang=0.05
+    OPENROUTER_API_URL=http://127.0.0.1:8099/api/v1/chat/completions OPENROUTER_API_KEY=test python app.py
+
+GET /stats returns request counts per outcome and the peak number of concurrent requests.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAULTS = ('429', '500', '503', 'truncated', 'malformed', 'hang')
+
+
+class FakeSettings:
+    def __init__(self, latency=0.5, jitter=0.0, tokens_per_second=0, chars_per_token=4, faults=None,
+                 hang_seconds=120, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.chars_per_token = chars_per_token
+        self.faults = dict(faults or {})
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def pick_outcome(self) -> str:
+        with self.lock:
+            roll = self.random.random()
+        for fault in FAULTS:
+            roll -= self.faults.get(fault, 0)
+            if roll < 0:
+                return fault
+        return 'ok'
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+
+def build_questions(prompt: str) -> str:
+    """
+    Reply content for a generation prompt, in the shape that prompt asks for
+    """
+    count_match = re.search(r'Number of questions:\s*(\d+)', prompt) or re.search(r'Generate (\d+) ', prompt)
+    count = int(count_match.group(1)) if count_match else 5
+    type_match = re.search(r'Question type:\s*(\w+)', prompt)
+    question_type = type_match.group(1) if type_match else 'mcq'
+    part_match = re.search(r'This is part (\d+) of', prompt)
+    prefix = f'Part {part_match.group(1)} ' if part_match else ''
+
+    # AIQuestionGenerator asks for a bare array with a letter as the correct answer
+    if 'JSON array' in prompt:
+        return json.dumps([{
+            'question_text': f'{prefix}Sample question {i + 1}?',
+            'options': ['Alpha', 'Beta', 'Gamma', 'Delta'],
+            'correct_answer': 'ABCD'[i % 4],
+            'marks': 1
+        } for i in range(count)])
+
+    questions = []
+    for i in range(count):
+        question = {'question_text': f'{prefix}Sample {question_type} question {i + 1}?', 'marks': 1}
+        if question_type == 'true_false':
+            question['correct_answer'] = 'True' if i % 2 == 0 else 'False'
+        elif question_type == 'short_answer':
+            question['correct_answer'] = f'Answer {i + 1}'
+        else:
+            question['options'] = ['Alpha', 'Beta', 'Gamma', 'Delta']
+            question['correct_option_index'] = i % 4
+        questions.append(question)
+    return json.dumps({'questions': questions})
+
+
+class FakeOpenRouterServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, settings: FakeSettings):
+        super().__init__(address, FakeOpenRouterHandler)
+        self.settings = settings
+        self.stats = {'requests': 0, 'in_flight': 0, 'peak_in_flight': 0, 'outcomes': {}}
+        self.stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/api/v1/chat/completions'
+
+    def track(self, delta: int, outcome: str = None):
+        with self.stats_lock:
+            self.stats['in_flight'] += delta
+            self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+            if outcome:
+                self.stats['requests'] += 1
+                self.stats['outcomes'][outcome] = self.stats['outcomes'].get(outcome, 0) + 1
+
+
+class FakeOpenRouterHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path != '/stats':
+            self.send_error(404)
+            return
+        with self.server.stats_lock:
+            self._send_json(200, self.server.stats)
+
+    def do_POST(self):
+        settings = self.server.settings
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        prompt = '\n'.join(str(message.get('content', '')) for message in body.get('messages', []))
+        outcome = settings.pick_outcome()
+
+        self.server.track(1, outcome)
+        try:
+            time.sleep(settings.delay())
+            if outcome == 'hang':
+                time.sleep(settings.hang_seconds)
+                self.close_connection = True
+                return
+            if outcome in ('429', '500', '503'):
+                headers = {'Retry-After': '1'} if outcome == '429' else {}
+                self._send_json(int(outcome), {'error': {'message': f'Simulated {outcome}', 'code': int(outcome)}},
+                                headers)
+                return
+
+            content = build_questions(prompt)
+            if outcome == 'truncated':
+                content = content[:len(content) // 2]
+            elif outcome == 'malformed':
+                content = 'Sure! Here are your questions: {questions: [' + content[15:]
+
+            if body.get('stream'):
+                self._stream(content, complete=outcome != 'truncated')
+            else:
+                self._send_json(200, {
+                    'id': 'fake-completion',
+                    'model': body.get('model'),
+                    'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content},
+                                 'finish_reason': 'length' if outcome == 'truncated' else 'stop'}]
+                })
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.track(-1)
+
+    def _send_json(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, content: str, complete: bool):
+        settings = self.server.settings
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        step = settings.chars_per_token
+        interval = 1.0 / settings.tokens_per_second if settings.tokens_per_second else 0
+        for start in range(0, len(content), step):
+            chunk = {'choices': [{'index': 0, 'delta': {'content': content[start:start + step]}}]}
+            self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+            self.wfile.flush()
+            if interval:
+                time.sleep(interval)
+        if complete:
+            self.wfile.write(b'data: [DONE]\n\n')
+            self.wfile.flush()
+
+
+def start_server(settings: FakeSettings, port: int = 0) -> FakeOpenRouterServer:
+    """
+    Start the stand-in on a background thread; port 0 picks a free port (see server.url)
+    """
+    server = FakeOpenRouterServer(('127.0.0.1', port), settings)
+    threading.Thread(target=server.serve_forever, name='fake-openrouter', daemon=True).start()
+    return server
+
+
+def parse_faults(values) -> dict:
+    faults = {}
+    for value in values or []:
+        name, _, rate = value.partition('=')
+        if name not in FAULTS:
+            raise argparse.ArgumentTypeError(f'Unknown fault {name!r}; choose from {", ".join(FAULTS)}')
+        faults[name] = float(rate)
+    return faults
+
+
+def add_settings_arguments(parser):
+    parser.add_argument('--latency', type=float, default=0.5, help='Seconds before the first byte (default 0.5)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- seconds added to the latency')
+    parser.add_argument('--tokens-per-second', type=float, default=0,
+                        help='Pace of streamed responses; 0 sends the stream as fast as possible')
+    parser.add_argument('--fault', action='append', metavar='NAME=RATE',
+                        help=f'Fault injection rate, repeatable; NAME is one of {", ".join(FAULTS)}')
+    parser.add_argument('--hang-seconds', type=float, default=120, help='How long a hung request stalls')
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def settings_from_args(args) -> FakeSettings:
+    return FakeSettings(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        faults=parse_faults(args.fault),
+        hang_seconds=args.hang_seconds,
+        seed=args.seed
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8099)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeOpenRouterServer(('127.0.0.1', args.port), settings_from_args(args))
+    print(f'Fake OpenRouter listening on {server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
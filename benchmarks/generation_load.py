@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+"""
+Benchmark: AI question generation under load, against the local OpenRouter stand-in
+Drives the teacher generation routes (enqueue + status polling) or AIQuestionGenerator directly
+with concurrent requests and reports latency percentiles, timeout/error rates and job worker occupancy.
+
+Run from the project root, e.g.:
+    python benchmarks/generation_load.py --requests 40 --concurrency 8 --latency 1.0 --jitter 0.5
+    python benchmarks/generation_load.py --tokens-per-second 150 --fault hang=0.1 --timeout 5
+    python benchmarks/generation_load.py --target generator --fault malformed=0.2 --no-stream
+"""
+
+import argparse
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_openrouter import add_settings_arguments, settings_from_args, start_server
+
+
+def percentile(values, pct):
+    if not values:
+        return float('nan')
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def classify(error) -> str:
+    if not error:
+        return 'ok'
+    text = str(error).lower()
+    if 'timed out' in text or 'exceeded' in text:
+        return 'timeout'
+    match = re.search(r'api error \((\d+)\)', text)
+    if match:
+        return f'http_{match.group(1)}'
+    return 'error'
+
+
+class OccupancySampler:
+    """
+    Samples how many job workers are busy by wrapping the generation job handler
+    """
+
+    def __init__(self, handlers, kind, max_workers, interval=0.05):
+        self.max_workers = max_workers
+        self.interval = interval
+        self.busy = 0
+        self.samples = []
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+        handler = handlers[kind]
+
+        def counted(*args, **kwargs):
+            with self.lock:
+                self.busy += 1
+            try:
+                return handler(*args, **kwargs)
+            finally:
+                with self.lock:
+                    self.busy -= 1
+        handlers[kind] = counted
+
+    def run(self):
+        while not self.stopped.is_set():
+            with self.lock:
+                self.samples.append(self.busy)
+            time.sleep(self.interval)
+
+    def start(self):
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def run_routes(app, args):
+    from controller import jobs
+
+    sampler = OccupancySampler(jobs._handlers, 'generate_questions', app.config['JOB_MAX_WORKERS'])
+
+    setup = app.test_client()
+    setup.post('/register', data=dict(username='load-teacher', email='load@example.com', password='pw',
+                                      role='Teacher'))
+    setup.post('/login', data=dict(email='load@example.com', password='pw'))
+    response = setup.post('/teacher/quiz/create', data=dict(title='Load test', description='', duration_minutes=30,
+                                                            total_marks=100))
+    quiz_id = int(re.search(r'/quiz/(\d+)/edit', response.headers['Location']).group(1))
+
+    def one_request(i):
+        client = app.test_client()
+        client.post('/login', data=dict(email='load@example.com', password='pw'))
+        start = time.perf_counter()
+        response = client.post(f'/teacher/quiz/{quiz_id}/generate-questions', data={
+            'action': 'generate',
+            'topic': f'Load topic {i}',
+            'num_questions': args.count,
+            'marks': 1,
+            'force_fresh': '1'
+        })
+        match = re.search(r'job_id=(\w+)', response.headers.get('Location', ''))
+        if not match:
+            return time.perf_counter() - start, 'rejected'
+
+        deadline = start + args.hard_timeout + 30
+        while time.perf_counter() < deadline:
+            job = client.get(f'/teacher/generation-jobs/{match.group(1)}').get_json()
+            if job['status'] not in ('queued', 'running'):
+                return time.perf_counter() - start, classify(job['error'])
+            time.sleep(args.poll_interval)
+        return time.perf_counter() - start, 'timeout'
+
+    sampler.start()
+    results = drive(one_request, args)
+    sampler.stop()
+
+    occupancy = [busy / sampler.max_workers for busy in sampler.samples] or [0]
+    return results, {
+        'mean worker occupancy': f'{statistics.mean(occupancy) * 100:.0f}%',
+        'peak busy workers': f'{max(sampler.samples or [0])}/{sampler.max_workers}',
+    }
+
+
+def run_generator(app, args):
+    from controller.ai_generator import AIQuestionGenerator
+
+    generator = AIQuestionGenerator(app.config)
+
+    def one_request(i):
+        start = time.perf_counter()
+        try:
+            generator.generate_mcq_questions(f'Load topic {i}', args.count)
+            return time.perf_counter() - start, 'ok'
+        except Exception as e:
+            return time.perf_counter() - start, classify(e)
+
+    return drive(one_request, args), {}
+
+
+def drive(one_request, args):
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        return list(executor.map(one_request, range(args.requests)))
+
+
+def report(args, server, results, extra, elapsed):
+    latencies = [latency for latency, _ in results]
+    ok = [latency for latency, outcome in results if outcome == 'ok']
+    outcomes = {}
+    for _, outcome in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    print("=" * 60)
+    print(f"GENERATION LOAD: {args.target}, {args.requests} requests, concurrency {args.concurrency}")
+    print("=" * 60)
+    print(f"{'wall time':<28}{elapsed:>10.2f} s")
+    print(f"{'throughput':<28}{len(results) / elapsed:>10.2f} req/s")
+    for label, values in (('all', latencies), ('succeeded', ok)):
+        print(f"latency {label:<20}" + ''.join(
+            f"p{pct}={percentile(values, pct):.2f}s  " for pct in (50, 90, 99)
+        ))
+    print(f"{'timeout rate':<28}{outcomes.get('timeout', 0) / len(results) * 100:>9.1f}%")
+    for outcome, count in sorted(outcomes.items()):
+        print(f"  {outcome:<26}{count:>10}")
+    for label, value in extra.items():
+        print(f"{label:<28}{value:>10}")
+    stats = server.stats
+    print(f"{'upstream requests':<28}{stats['requests']:>10}")
+    print(f"{'upstream peak in flight':<28}{stats['peak_in_flight']:>10}")
+    for outcome, count in sorted(stats['outcomes'].items()):
+        print(f"  upstream {outcome:<17}{count:>10}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', choices=('routes', 'generator'), default='routes')
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--count', type=int, default=5, help='Questions per request')
+    parser.add_argument('--stream', action=argparse.BooleanOptionalAction, default=True,
+                        help='Use streaming completions (OPENROUTER_STREAMING)')
+    parser.add_argument('--timeout', type=int, default=10, help='OPENROUTER_TIMEOUT_SECONDS')
+    parser.add_argument('--hard-timeout', type=int, default=20, help='OPENROUTER_HARD_TIMEOUT_SECONDS')
+    parser.add_argument('--workers', type=int, default=4, help='JOB_MAX_WORKERS')
+    parser.add_argument('--poll-interval', type=float, default=0.1)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(settings_from_args(args))
+
+    with tempfile.TemporaryDirectory(prefix='quiz-genload-') as workdir:
+        # The app reads its configuration at import time
+        os.environ.update({
+            'DATABASE_URL': 'sqlite:///' + os.path.join(workdir, 'bench.db'),
+            'OPENROUTER_API_KEY': 'benchmark',
+            'OPENROUTER_API_URL': server.url,
+            'OPENROUTER_STREAMING': '1' if args.stream else '0',
+            'OPENROUTER_TIMEOUT_SECONDS': str(args.timeout),
+            'OPENROUTER_HARD_TIMEOUT_SECONDS': str(args.hard_timeout),
+            'JOB_MAX_WORKERS': str(args.workers),
+            'JOB_MAX_PENDING_PER_USER': str(args.requests + 1),
+        })
+        from app import app
+
+        start = time.perf_counter()
+        runner = run_routes if args.target == 'routes' else run_generator
+        results, extra = runner(app, args)
+        report(args, server, results, extra, time.perf_counter() - start)
+
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
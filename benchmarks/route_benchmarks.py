@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+"""
+Route benchmarks against stored baselines
+Seeds a scratch database (see seed_data.py), drives the hot routes through the Flask test client and
+records median/p95 latency, SQL statements per request and peak Python memory per request. Results are
+compared with benchmarks/route_baselines.json; any regression beyond the tolerances exits with status 1.
+
+Run from the project root:
+    python benchmarks/route_benchmarks.py                      # compare with the stored baseline
+    python benchmarks/route_benchmarks.py --scale small --route quiz_results
+    python benchmarks/route_benchmarks.py --update-baseline    # record new numbers after an intended change
+
+Latency depends on the machine, so record the baseline on the machine that runs the comparison.
+SQL counts are compared exactly: one extra statement per request is a regression.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from seed_data import SCALES, load_app, seed
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'route_baselines.json')
+ROUTES = ('submit_quiz', 'start_quiz', 'student_dashboard', 'teacher_dashboard', 'quiz_results', 'admin_dashboard',
+          'autosave_quiz')
+
+
+class QueryCounter:
+    """
+    Counts SQL statements sent to the engine (an executemany counts once)
+
+    Only statements from the thread that created the counter (the one issuing requests) are counted,
+    so background threads such as the draft flusher don't skew a route's count.
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self.thread_id = threading.get_ident()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        if threading.get_ident() == self.thread_id:
+            self.count += 1
+
+
+def pick_fixtures(app, counts, runs):
+    """
+    Choose the users and quiz each route is exercised with
+
+    The target quiz is the seeded quiz with the most submissions; submit_quiz needs a fresh student per run.
+    """
+    from sqlalchemy import func
+    from controller.database import db
+    from controller.models import Quiz, QuizSubmission, User
+    from controller.answer_key import compile_answer_key
+
+    with app.app_context():
+        quiz_id = db.session.query(QuizSubmission.quiz_id).filter(
+            QuizSubmission.quiz_id.in_(counts['quiz_ids'])
+        ).group_by(QuizSubmission.quiz_id).order_by(func.count().desc()).limit(1).scalar()
+        teacher_id = db.session.get(Quiz, quiz_id).teacher_id
+        submitted = {row.student_id for row in QuizSubmission.query.filter_by(quiz_id=quiz_id)}
+        fresh = [student_id for student_id in counts['student_ids'] if student_id not in submitted]
+        if len(fresh) < runs + 1:
+            raise SystemExit('Not enough students without a submission; use a larger --scale or fewer --repeat')
+        with_history = next(student_id for student_id in counts['student_ids'] if student_id in submitted)
+        admin_id = User.query.filter_by(email='admin@gmail.com').first().id
+
+        # A complete, realistic answer sheet: the correct answer to every question
+        form = {}
+        for item in compile_answer_key(quiz_id).entries:
+            key = f"question_{item['question_id']}"
+            if item['question_type'] == 'mcq':
+                form[key] = str(min(item['correct_option_ids']))
+            else:
+                form[key] = item['correct_answer']
+
+    return {
+        'quiz_id': quiz_id, 'teacher_id': teacher_id, 'admin_id': admin_id, 'student_id': with_history,
+        'fresh_students': fresh, 'answer_form': form,
+    }
+
+
+def build_requests(fixtures):
+    """
+    For each route: (user id for run i, function issuing the request for run i, expected status)
+    """
+    quiz_id = fixtures['quiz_id']
+    fresh = fixtures['fresh_students']
+    answer_items = list(fixtures['answer_form'].items())
+    return {
+        # Every run submits as a different student, as a real submission burst would
+        'submit_quiz': (lambda i: fresh[i + 1],
+                        lambda client, i: client.post(f'/student/quiz/{quiz_id}/submit', data=fixtures['answer_form']),
+                        302),
+        'start_quiz': (lambda i: fresh[0],
+                       lambda client, i: client.get(f'/student/quiz/{quiz_id}/start'), 200),
+        'student_dashboard': (lambda i: fixtures['student_id'],
+                              lambda client, i: client.get('/student/dashboard'), 200),
+        'teacher_dashboard': (lambda i: fixtures['teacher_id'],
+                              lambda client, i: client.get('/teacher/dashboard'), 200),
+        'quiz_results': (lambda i: fixtures['teacher_id'],
+                         lambda client, i: client.get(f'/teacher/quiz/{quiz_id}/results'), 200),
+        'admin_dashboard': (lambda i: fixtures['admin_id'],
+                            lambda client, i: client.get('/admin/dashboard'), 200),
+        # One changed answer per request, as the take-quiz page sends it
+        'autosave_quiz': (lambda i: fresh[0],
+                          lambda client, i: client.post(f'/student/quiz/{quiz_id}/autosave',
+                                                        json={'answers': dict([answer_items[i % len(answer_items)]])}),
+                          200),
+    }
+
+
+def measure(app, counter, route, user_for, issue, expected_status, repeat) -> dict:
+    """
+    One warm-up request, `repeat` timed requests, then one request under tracemalloc for peak memory
+    """
+    def run(i):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = user_for(i)
+        counter.count = 0
+        start = time.perf_counter()
+        response = issue(client, i)
+        elapsed = time.perf_counter() - start
+        if response.status_code != expected_status or '/login' in response.headers.get('Location', ''):
+            raise SystemExit(f'❌ {route}: unexpected response {response.status_code} '
+                             f'{response.headers.get("Location", "")}')
+        return elapsed, counter.count
+
+    run(0)
+    timings, queries = [], []
+    for i in range(1, repeat + 1):
+        elapsed, count = run(i)
+        timings.append(elapsed * 1000)
+        queries.append(count)
+
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        run(repeat + 1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(timings)
+    return {
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(ordered[min(len(ordered) - 1, round(0.95 * (len(ordered) - 1)))], 2),
+        'sql_queries': max(queries),
+        'peak_kib': round((peak - baseline) / 1024, 1),
+    }
+
+
+def compare(results, baseline, args) -> list:
+    """
+    Returns:
+        One message per regressed metric
+    """
+    failures = []
+    for route, result in results.items():
+        expected = baseline.get(route)
+        if not expected:
+            continue
+        if result['sql_queries'] > expected['sql_queries']:
+            failures.append(f"{route}: {result['sql_queries']} SQL statements, baseline {expected['sql_queries']}")
+        latency_limit = expected['median_ms'] * (1 + args.latency_tolerance) + args.latency_slack_ms
+        if result['median_ms'] > latency_limit:
+            failures.append(f"{route}: median {result['median_ms']:.1f} ms, limit {latency_limit:.1f} ms "
+                            f"(baseline {expected['median_ms']:.1f} ms)")
+        memory_limit = expected['peak_kib'] * (1 + args.memory_tolerance) + args.memory_slack_kib
+        if result['peak_kib'] > memory_limit:
+            failures.append(f"{route}: peak {result['peak_kib']:.0f} KiB, limit {memory_limit:.0f} KiB "
+                            f"(baseline {expected['peak_kib']:.0f} KiB)")
+    return failures
+
+
+def report(args, counts, results, baseline):
+    print("=" * 78)
+    print(f"ROUTE BENCHMARKS: scale {args.scale}, {counts['answers']} answers, "
+          f"{counts['students'] + counts['teachers']} users, {args.repeat} runs per route")
+    print("=" * 78)
+    print(f"{'route':<20}{'median ms':>11}{'p95 ms':>9}{'SQL':>6}{'peak KiB':>10}   baseline (ms / SQL / KiB)")
+    for route, result in results.items():
+        expected = baseline.get(route)
+        against = (f"{expected['median_ms']:.1f} / {expected['sql_queries']} / {expected['peak_kib']:.0f}"
+                   if expected else 'none')
+        print(f"{route:<20}{result['median_ms']:>11.1f}{result['p95_ms']:>9.1f}{result['sql_queries']:>6}"
+              f"{result['peak_kib']:>10.0f}   {against}")
+    print("=" * 78)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', choices=sorted(SCALES), default='default')
+    parser.add_argument('--route', action='append', choices=ROUTES, help='Benchmark only this route, repeatable')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed requests per route')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Store these results as the baseline instead of comparing')
+    parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                        help='Allowed relative increase of the median latency (default 0.5 = +50%%)')
+    parser.add_argument('--latency-slack-ms', type=float, default=2.0,
+                        help='Absolute latency allowance on top of the tolerance, for very fast routes')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25)
+    parser.add_argument('--memory-slack-kib', type=float, default=64)
+    args = parser.parse_args()
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+    baseline = stored.get(args.scale, {})
+
+    with tempfile.TemporaryDirectory(prefix='quiz-routebench-') as workdir:
+        app = load_app(os.path.join(workdir, 'bench.db'))
+        with app.app_context():
+            counts = seed(**SCALES[args.scale])
+
+        fixtures = pick_fixtures(app, counts, args.repeat + 2)
+        requests = build_requests(fixtures)
+        results = {}
+        with app.app_context():
+            from controller.database import db
+            counter = QueryCounter(db.engine)
+        for route in args.route or ROUTES:
+            results[route] = measure(app, counter, route, *requests[route], repeat=args.repeat)
+
+    report(args, counts, results, baseline)
+
+    if args.update_baseline:
+        stored[args.scale] = dict(baseline, **results)
+        with open(args.baseline, 'w') as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"✅ Baseline for scale {args.scale} written to {args.baseline}")
+        return
+
+    missing = [route for route in results if route not in baseline]
+    if missing:
+        print(f"⚠️ No baseline for {', '.join(missing)}; run with --update-baseline to record one")
+
+    failures = compare(results, baseline, args)
+    if failures:
+        print("❌ PERFORMANCE REGRESSION")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("✅ No regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Synthetic data for benchmarks
+Fills a scratch database with teachers and students (through Role/user_role), published quizzes
+with mixed question types, and graded submissions with one StudentAnswer per question.
+Rows are written with bulk core INSERTs, so the default scale (~200k answers) seeds in seconds.
+
+Run from the project root (never point it at a real database):
+    python benchmarks/seed_data.py --database /tmp/quiz-bench.db --scale default
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCALES = {
+    'small': {'teachers': 5, 'students': 200, 'quizzes': 20, 'questions_per_quiz': 10, 'submissions_per_student': 3},
+    'default': {'teachers': 20, 'students': 2000, 'quizzes': 100, 'questions_per_quiz': 20,
+                'submissions_per_student': 5},
+    'large': {'teachers': 50, 'students': 10000, 'quizzes': 300, 'questions_per_quiz': 25,
+              'submissions_per_student': 10},
+}
+
+QUESTION_TYPE_WEIGHTS = (('mcq', 0.6), ('true_false', 0.25), ('short_answer', 0.15))
+BATCH_ROWS = 20000
+
+
+def _insert_batched(table, rows):
+    from controller.database import db
+    from sqlalchemy import insert
+
+    for start in range(0, len(rows), BATCH_ROWS):
+        db.session.execute(insert(table), rows[start:start + BATCH_ROWS])
+
+
+def _next_id(model):
+    from controller.database import db
+    from sqlalchemy import func
+
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def seed(teachers, students, quizzes, questions_per_quiz, submissions_per_student, seed_value=42) -> dict:
+    """
+    Insert synthetic rows into the current app's database; call inside an app context
+
+    Ids are assigned up front so every table is written with plain bulk INSERTs.
+
+    Returns:
+        Row counts plus the ids of the created teachers, students and quizzes
+    """
+    from controller.database import db
+    from controller.models import User, Role, Quiz, Question, Option, QuizSubmission, StudentAnswer, user_role
+    from werkzeug.security import generate_password_hash
+
+    rng = random.Random(seed_value)
+    password = generate_password_hash('password')  # hashing is slow, so every account shares one
+    now = datetime.utcnow()
+    roles = {role.rolename: role.id for role in Role.query.all()}
+
+    first_user = _next_id(User)
+    teacher_ids = list(range(first_user, first_user + teachers))
+    student_ids = list(range(first_user + teachers, first_user + teachers + students))
+    _insert_batched(User.__table__, [
+        {'id': user_id, 'username': f'seed_user_{user_id}', 'email': f'seed_user_{user_id}@example.com',
+         'password': password, 'created_at': now}
+        for user_id in teacher_ids + student_ids
+    ])
+    _insert_batched(user_role, (
+        [{'user_id': user_id, 'role_id': roles['Teacher']} for user_id in teacher_ids] +
+        [{'user_id': user_id, 'role_id': roles['Student']} for user_id in student_ids]
+    ))
+
+    first_quiz = _next_id(Quiz)
+    quiz_ids = list(range(first_quiz, first_quiz + quizzes))
+    _insert_batched(Quiz.__table__, [
+        {'id': quiz_id, 'title': f'Seed quiz {quiz_id}', 'description': 'Synthetic benchmark quiz',
+         'teacher_id': teacher_ids[i % len(teacher_ids)], 'created_at': now, 'updated_at': now,
+         'duration_minutes': 30, 'total_marks': questions_per_quiz * 2, 'is_published': True}
+        for i, quiz_id in enumerate(quiz_ids)
+    ])
+
+    # Question layout per quiz: (question id, type, marks, correct answer, [(option id, is_correct)])
+    question_rows, option_rows, layouts = [], [], {}
+    question_id, option_id = _next_id(Question), _next_id(Option)
+    types, weights = zip(*QUESTION_TYPE_WEIGHTS)
+    for quiz_id in quiz_ids:
+        layout = []
+        for number in range(questions_per_quiz):
+            question_type = rng.choices(types, weights)[0]
+            marks = rng.choice((1, 1, 2, 3))
+            correct_answer = {'true_false': rng.choice(('True', 'False')), 'short_answer': f'answer {number}'}.get(
+                question_type)
+            question_rows.append({
+                'id': question_id, 'quiz_id': quiz_id, 'question_type': question_type, 'marks': marks,
+                'question_text': f'Seed question {number + 1} of quiz {quiz_id} about topic {rng.randint(1, 10**6)}?',
+                'correct_answer': correct_answer
+            })
+            options = []
+            if question_type == 'mcq':
+                correct = rng.randrange(4)
+                for index in range(4):
+                    option_rows.append({'id': option_id, 'question_id': question_id,
+                                        'option_text': f'Option {index + 1}', 'is_correct': index == correct})
+                    options.append((option_id, index == correct))
+                    option_id += 1
+            layout.append((question_id, question_type, marks, correct_answer, options))
+            question_id += 1
+        layouts[quiz_id] = layout
+    _insert_batched(Question.__table__, question_rows)
+    _insert_batched(Option.__table__, option_rows)
+
+    submission_rows, answer_rows = [], []
+    for student_id in student_ids:
+        ability = rng.random()
+        taken = rng.sample(quiz_ids, min(submissions_per_student, len(quiz_ids)))
+        for quiz_id in taken:
+            score = 0
+            total = 0
+            for question_id, question_type, marks, correct_answer, options in layouts[quiz_id]:
+                correct = rng.random() < 0.3 + 0.6 * ability
+                answer = {'quiz_id': quiz_id, 'question_id': question_id, 'student_id': student_id,
+                          'answer_text': None, 'selected_option_id': None}
+                if question_type == 'mcq':
+                    choices = [oid for oid, is_correct in options if is_correct == correct]
+                    answer['selected_option_id'] = rng.choice(choices)
+                elif question_type == 'true_false':
+                    answer['answer_text'] = correct_answer if correct else ('False' if correct_answer == 'True' else 'True')
+                else:
+                    answer['answer_text'] = correct_answer if correct else f'guess {rng.randint(1, 99)}'
+                    correct = False  # left for the short-answer auto-grader
+                answer['is_correct'] = correct
+                answer['marks_obtained'] = marks if correct else 0
+                answer_rows.append(answer)
+                score += answer['marks_obtained']
+                total += marks
+            submission_rows.append({
+                'quiz_id': quiz_id, 'student_id': student_id, 'score': score, 'total_marks': total,
+                'submitted_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+            })
+    _insert_batched(QuizSubmission.__table__, submission_rows)
+    _insert_batched(StudentAnswer.__table__, answer_rows)
+    db.session.commit()
+
+    return {
+        'teachers': len(teacher_ids), 'students': len(student_ids), 'quizzes': len(quiz_ids),
+        'questions': len(question_rows), 'options': len(option_rows),
+        'submissions': len(submission_rows), 'answers': len(answer_rows),
+        'teacher_ids': teacher_ids, 'student_ids': student_ids, 'quiz_ids': quiz_ids,
+    }
+
+
+def load_app(database_path: str):
+    """
+    Import the app against a scratch SQLite database (the app reads its config at import time)
+    """
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.abspath(database_path)
+    from app import app
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database', required=True, help='Path of the scratch SQLite database to create')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='default')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        parser.error(f'{args.database} already exists; seed a fresh scratch database')
+
+    app = load_app(args.database)
+    with app.app_context():
+        start = time.perf_counter()
+        counts = seed(seed_value=args.seed, **SCALES[args.scale])
+        elapsed = time.perf_counter() - start
+
+    print(f"✅ Seeded {args.database} ({args.scale}) in {elapsed:.1f}s")
+    for name in ('teachers', 'students', 'quizzes', 'questions', 'options', 'submissions', 'answers'):
+        print(f"  {name:<12}{counts[name]:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Benchmark: SQLite write-lock hold time per quiz submission
+Compares the ORM unit-of-work path with the bulk INSERT path used by submit_quiz
+
+Run from the project root:
+    python benchmarks/submission_write_lock.py
+"""
+
+import os
+import sys
+import statistics
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from controller.database import db
+from controller.models import Quiz, Question, Option, QuizSubmission, StudentAnswer, User
+from controller.answer_key import get_answer_key, grade_answers
+from controller.submissions import save_submission
+
+QUESTION_COUNTS = [10, 50, 200]
+SUBMISSIONS_PER_QUIZ = 50
+
+
+def build_quiz(teacher_id, question_count):
+    quiz = Quiz(title=f'Benchmark {question_count}', teacher_id=teacher_id, is_published=True)
+    db.session.add(quiz)
+    db.session.flush()
+    for i in range(question_count):
+        question = Question(quiz_id=quiz.id, question_text=f'Question {i}', question_type='mcq', marks=1)
+        db.session.add(question)
+        for j in range(4):
+            question.options.append(Option(option_text=f'Option {j}', is_correct=(j == 0)))
+    db.session.commit()
+    return quiz.id
+
+
+def build_form(answer_key):
+    form = {}
+    for entry in answer_key.entries:
+        form[f"question_{entry['question_id']}"] = str(min(entry['correct_option_ids']))
+    return form
+
+
+def orm_write(quiz_id, student_id, score, total_marks, answers):
+    for answer in answers:
+        db.session.add(StudentAnswer(quiz_id=quiz_id, student_id=student_id, **answer))
+    db.session.add(QuizSubmission(quiz_id=quiz_id, student_id=student_id, score=score, total_marks=total_marks))
+    start = time.perf_counter()
+    db.session.commit()  # flush + commit: the write lock is held for this whole call
+    return time.perf_counter() - start
+
+
+def bulk_write(quiz_id, student_id, score, total_marks, answers):
+    start = time.perf_counter()
+    save_submission(quiz_id, student_id, score, total_marks, answers)
+    return time.perf_counter() - start
+
+
+def run(workdir):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(workdir, 'bench.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        teacher = User(username='bench-teacher', email='bench@example.com', password='x')
+        db.session.add(teacher)
+        db.session.commit()
+
+        print("=" * 60)
+        print(f"WRITE-LOCK HOLD TIME PER SUBMISSION ({SUBMISSIONS_PER_QUIZ} submissions each)")
+        print("=" * 60)
+        print(f"{'questions':>10} {'orm median ms':>15} {'bulk median ms':>15} {'speedup':>9}")
+
+        student_id = 1000
+        for question_count in QUESTION_COUNTS:
+            quiz_id = build_quiz(teacher.id, question_count)
+            answer_key = get_answer_key(quiz_id)
+            form = build_form(answer_key)
+
+            timings = {'orm': [], 'bulk': []}
+            for _ in range(SUBMISSIONS_PER_QUIZ):
+                for name, write in (('orm', orm_write), ('bulk', bulk_write)):
+                    student_id += 1
+                    score, total_marks, answers = grade_answers(answer_key, form)
+                    timings[name].append(write(quiz_id, student_id, score, total_marks, answers))
+
+            orm_ms = statistics.median(timings['orm']) * 1000
+            bulk_ms = statistics.median(timings['bulk']) * 1000
+            print(f"{question_count:>10} {orm_ms:>15.2f} {bulk_ms:>15.2f} {orm_ms / bulk_ms:>8.1f}x")
+
+        print("=" * 60)
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory(prefix='quiz-bench-') as workdir:
+        run(workdir)
@@ -4,11 +4,70 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+
+def engine_options(database_uri):
+    """
+    SQLAlchemy engine options for the configured database
+
+    Pool sizing only applies to pooled engines; in-memory SQLite uses a single static connection.
+    """
+    if database_uri in ("sqlite://", "sqlite:///:memory:"):
+        return {}
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")),
+        "pool_pre_ping": True,
+    }
+
+
 class Config:
     SECRET_KEY = "supersecretkey"
-    SQLALCHEMY_DATABASE_URI = "sqlite:///site.db"
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///site.db")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Connect-time PRAGMAs, applied only when the database is SQLite
+    SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
     OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-4o-mini")
+    OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+    OPENROUTER_POOL_SIZE = int(os.getenv("OPENROUTER_POOL_SIZE", "16"))
+    # Stream completions so questions reach the review page as soon as each one is complete
+    OPENROUTER_STREAMING = os.getenv("OPENROUTER_STREAMING", "1") == "1"
     OPENROUTER_TIMEOUT_SECONDS = int(os.getenv("OPENROUTER_TIMEOUT_SECONDS", "25"))
     OPENROUTER_HARD_TIMEOUT_SECONDS = int(os.getenv("OPENROUTER_HARD_TIMEOUT_SECONDS", "40"))
+    # Shared worker pool for background AI generation jobs
+    JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "4"))
+    JOB_MAX_PENDING_PER_USER = int(os.getenv("JOB_MAX_PENDING_PER_USER", "3"))
+    # Cache for repeated AI generation requests
+    GENERATION_CACHE_MEMORY_ENTRIES = int(os.getenv("GENERATION_CACHE_MEMORY_ENTRIES", "256"))
+    GENERATION_CACHE_MAX_ENTRIES = int(os.getenv("GENERATION_CACHE_MAX_ENTRIES", "5000"))
+    GENERATION_CACHE_TTL_SECONDS = int(os.getenv("GENERATION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    # Large AI requests are split into chunks generated concurrently
+    GENERATION_CHUNK_SIZE = int(os.getenv("GENERATION_CHUNK_SIZE", "5"))
+    GENERATION_CHUNK_WORKERS = int(os.getenv("GENERATION_CHUNK_WORKERS", "8"))
+    # Questions at least this similar (Jaccard of character shingles) to an existing one count as duplicates
+    DUPLICATE_SIMILARITY_THRESHOLD = float(os.getenv("DUPLICATE_SIMILARITY_THRESHOLD", "0.8"))
+    # How long a user's role is trusted from memory before it is re-read from the database
+    IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))
+    # Rows per page on paginated dashboards
+    DASHBOARD_PAGE_SIZE = int(os.getenv("DASHBOARD_PAGE_SIZE", "20"))
+    ADMIN_USERS_PAGE_SIZE = int(os.getenv("ADMIN_USERS_PAGE_SIZE", "100"))
+    IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "5000"))
+    # Admin dashboard counters are kept current in-process and fully recomputed after this long
+    PLATFORM_STATS_TTL_SECONDS = int(os.getenv("PLATFORM_STATS_TTL_SECONDS", "60"))
+    # Short-answer auto-grading: similarity at or above ACCEPT earns full marks, from REVIEW up is flagged for the teacher
+    SHORT_ANSWER_ACCEPT_THRESHOLD = float(os.getenv("SHORT_ANSWER_ACCEPT_THRESHOLD", "0.85"))
+    SHORT_ANSWER_REVIEW_THRESHOLD = float(os.getenv("SHORT_ANSWER_REVIEW_THRESHOLD", "0.6"))
+    # Numeric short answers within this relative difference of the expected value are accepted
+    SHORT_ANSWER_NUMERIC_TOLERANCE = float(os.getenv("SHORT_ANSWER_NUMERIC_TOLERANCE", "0.01"))
+    # Request/SQL/template/OpenRouter instrumentation, served to admins at /admin/metrics
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+    # Optional bearer token so a Prometheus scraper can read /admin/metrics without an admin session
+    METRICS_SCRAPE_TOKEN = os.getenv("METRICS_SCRAPE_TOKEN", "")
+    # Autosaved quiz answers are buffered in memory and written to the database in one batch this often
+    DRAFT_FLUSH_INTERVAL_SECONDS = float(os.getenv("DRAFT_FLUSH_INTERVAL_SECONDS", "3"))
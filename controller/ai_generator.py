@@ -3,15 +3,14 @@ AI Question Generator using OpenRouter API
 Generates quiz questions using Claude AI
 """
 
-import requests
-import json
 from config import Config
+from controller.openrouter_client import chat_completion, parse_json_content
 
 class AIQuestionGenerator:
-    def __init__(self):
-        self.api_key = Config.OPENROUTER_API_KEY
-        self.model = Config.OPENROUTER_MODEL
-        self.api_url = "https://openrouter.ai/api/v1/chat/completions"
+    def __init__(self, config=None):
+        # Any mapping of OPENROUTER_* settings (e.g. app.config); defaults to config.Config
+        self.config = config
+        self.api_key = config.get('OPENROUTER_API_KEY') if config is not None else Config.OPENROUTER_API_KEY
     
     def generate_mcq_questions(self, topic: str, num_questions: int) -> list:
         """
@@ -48,59 +47,27 @@ Format your response as a JSON array like this:
 
 Only return valid JSON array, no other text."""
 
-        try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {{
-                        "role": "user",
-                        "content": prompt
-                    }}
-                ],
-                "temperature": 0.7,
-                "max_tokens": 4000
-            }
-            
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            if "choices" not in data or len(data["choices"]) == 0:
-                raise ValueError("No response from API")
-            
-            content = data["choices"][0]["message"]["content"]
-            
-            # Extract JSON from response
-            questions = self._parse_questions(content)
-            
-            return questions
-            
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"API Request failed: {str(e)}")
-        except json.JSONDecodeError as e:
-            raise Exception(f"Failed to parse AI response: {str(e)}")
+        content = chat_completion(
+            [{"role": "user", "content": prompt}],
+            config=self.config,
+            temperature=0.7,
+            max_tokens=4000
+        )
+        
+        # Extract JSON from response
+        return self._parse_questions(content)
     
     def _parse_questions(self, response_text: str) -> list:
         """
         Parse AI response to extract questions
         """
         try:
-            # Try to extract JSON from response
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
-            
-            if start_idx == -1 or end_idx == 0:
+            questions = parse_json_content(response_text)
+            if isinstance(questions, dict):
+                questions = questions.get('questions', [])
+            if not isinstance(questions, list):
                 raise ValueError("No JSON array found in response")
             
-            json_str = response_text[start_idx:end_idx]
-            questions = json.loads(json_str)
-            
             # Validate questions
             validated = []
             for q in questions:
@@ -119,7 +86,7 @@ Only return valid JSON array, no other text."""
             
             return validated
             
-        except (json.JSONDecodeError, ValueError, KeyError) as e:
+        except (ValueError, KeyError) as e:
             raise Exception(f"Invalid question format: {str(e)}")
 
 
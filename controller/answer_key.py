@@ -0,0 +1,159 @@
+"""
+Compiled answer keys for quiz grading
+Builds a per-quiz answer key once and grades submissions entirely in memory
+"""
+
+import threading
+from controller.database import db
+from controller.models import Question, Option
+from controller.short_answer_grading import GRADED_AUTO, normalize_answer, same_answer
+
+_answer_keys = {}
+_generations = {}
+_lock = threading.Lock()
+
+
+class AnswerKey:
+    """
+    Immutable grading data for one quiz
+
+    entries holds one dict per question, in question order:
+        {'question_id', 'question_type', 'marks', 'correct_option_ids', 'correct_answer', 'normalized_answer'}
+    """
+
+    def __init__(self, quiz_id: int, entries: list):
+        self.quiz_id = quiz_id
+        self.entries = entries
+        self.total_marks = sum(entry['marks'] for entry in entries)
+
+
+def compile_answer_key(quiz_id: int) -> AnswerKey:
+    """
+    Load questions and correct options for a quiz in two queries
+    """
+    questions = db.session.query(
+        Question.id, Question.question_type, Question.marks, Question.correct_answer
+    ).filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+
+    correct_options = {}
+    rows = db.session.query(Option.question_id, Option.id).join(
+        Question, Option.question_id == Question.id
+    ).filter(Question.quiz_id == quiz_id, Option.is_correct.is_(True)).all()
+    for question_id, option_id in rows:
+        correct_options.setdefault(question_id, set()).add(option_id)
+
+    entries = []
+    for question_id, question_type, marks, correct_answer in questions:
+        entries.append({
+            'question_id': question_id,
+            'question_type': question_type,
+            'marks': marks or 0,
+            'correct_option_ids': frozenset(correct_options.get(question_id, ())),
+            'correct_answer': correct_answer.strip() if correct_answer else None,
+            'normalized_answer': normalize_answer(correct_answer) if question_type == 'short_answer' else None,
+        })
+
+    return AnswerKey(quiz_id, entries)
+
+
+def get_answer_key(quiz_id: int) -> AnswerKey:
+    """
+    Return the cached answer key for a quiz, compiling it on first use
+    """
+    answer_key = _answer_keys.get(quiz_id)
+    if answer_key is None:
+        generation = _generations.get(quiz_id, 0)
+        answer_key = compile_answer_key(quiz_id)
+        with _lock:
+            # Don't cache a key that was invalidated while it was being compiled
+            if _generations.get(quiz_id, 0) == generation:
+                _answer_keys[quiz_id] = answer_key
+    return answer_key
+
+
+def invalidate_answer_key(quiz_id: int):
+    """
+    Drop the cached answer key after a quiz or its questions change
+    """
+    with _lock:
+        _answer_keys.pop(quiz_id, None)
+        _generations[quiz_id] = _generations.get(quiz_id, 0) + 1
+
+
+def grade_answers(answer_key: AnswerKey, responses) -> tuple:
+    """
+    Grade a student's responses against a compiled answer key
+
+    Args:
+        answer_key: Compiled key for the quiz
+        responses: Mapping of 'question_<id>' to the submitted value (e.g. request.form)
+
+    Returns:
+        (score, total_marks, answers) where answers is a list of StudentAnswer column dicts
+    """
+    score = 0
+    answers = []
+
+    for entry in answer_key.entries:
+        question_id = entry['question_id']
+        question_type = entry['question_type']
+        answer = responses.get(f'question_{question_id}')
+
+        if question_type == 'mcq':
+            if not answer:
+                continue
+            try:
+                selected_option_id = int(answer)
+            except (TypeError, ValueError):
+                selected_option_id = None
+            is_correct = selected_option_id in entry['correct_option_ids']
+            marks = entry['marks'] if is_correct else 0
+            score += marks
+            answers.append({
+                'question_id': question_id,
+                'selected_option_id': selected_option_id,
+                'answer_text': None,
+                'is_correct': is_correct,
+                'marks_obtained': marks,
+                'grading_status': None
+            })
+
+        elif question_type == 'true_false':
+            # Case-sensitive comparison for True/False (they should be exactly "True" or "False")
+            if not answer or not entry['correct_answer']:
+                is_correct = False
+            else:
+                is_correct = answer.strip() == entry['correct_answer']
+            marks = entry['marks'] if is_correct else 0
+            score += marks
+            answers.append({
+                'question_id': question_id,
+                'selected_option_id': None,
+                'answer_text': answer,
+                'is_correct': is_correct,
+                'marks_obtained': marks,
+                'grading_status': None
+            })
+
+        elif question_type == 'short_answer':
+            # Exact matches after normalization score now; the rest wait for the batch auto-grader
+            is_correct = same_answer(normalize_answer(answer), entry['normalized_answer'])
+            marks = entry['marks'] if is_correct else 0
+            score += marks
+            answers.append({
+                'question_id': question_id,
+                'selected_option_id': None,
+                'answer_text': answer,
+                'is_correct': is_correct,
+                'marks_obtained': marks,
+                'grading_status': GRADED_AUTO if is_correct else None
+            })
+
+    return score, answer_key.total_marks, answers
+
+
+def answer_key_generation(quiz_id: int) -> int:
+    """
+    Counter bumped on every invalidation, for caches derived from a quiz's questions
+    """
+    return _generations.get(quiz_id, 0)
@@ -0,0 +1,81 @@
+"""
+Chunked AI question generation
+Splits large requests into small chunks generated concurrently, then merges and de-duplicates them
+"""
+
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _get_executor(max_workers: int) -> ThreadPoolExecutor:
+    # Separate from the job pool: a job worker waits on its chunks, so sharing a pool could deadlock
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='generation-chunk')
+        return _executor
+
+
+def split_count(count: int, chunk_size: int) -> list:
+    """
+    Split a question count into near-equal chunk sizes, e.g. 12 by 5 -> [4, 4, 4]
+    """
+    chunks = max(1, -(-count // max(1, chunk_size)))
+    base, extra = divmod(count, chunks)
+    return [base + (1 if i < extra else 0) for i in range(chunks)]
+
+
+def question_fingerprint(question: dict) -> str:
+    text = str(question.get('question_text', '')).lower()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+
+def generate_in_chunks(app, generate, count: int, **kwargs) -> dict:
+    """
+    Generate `count` questions as concurrent chunks and merge the results
+
+    Args:
+        app: Flask app; every chunk runs in its own app context
+        generate: Generation function accepting count=, part= and the remaining kwargs
+
+    Returns:
+        {'questions': list, 'failed_chunks': int}; raises the first error if every chunk failed
+    """
+    sizes = split_count(count, app.config.get('GENERATION_CHUNK_SIZE', 5))
+    if len(sizes) == 1:
+        return {'questions': generate(count=count, **kwargs), 'failed_chunks': 0}
+
+    def run_chunk(index, size):
+        with app.app_context():
+            return generate(count=size, part=(index + 1, len(sizes)), **kwargs)
+
+    executor = _get_executor(app.config.get('GENERATION_CHUNK_WORKERS', 8))
+    futures = {executor.submit(run_chunk, index, size): index for index, size in enumerate(sizes)}
+
+    results = {}
+    errors = []
+    for future in as_completed(futures):
+        try:
+            results[futures[future]] = future.result()
+        except Exception as e:
+            errors.append(e)
+
+    if not results:
+        raise errors[0]
+
+    # Merge in chunk order, dropping questions another chunk already produced
+    merged = []
+    seen = set()
+    for index in sorted(results):
+        for question in results[index]:
+            fingerprint = question_fingerprint(question)
+            if not fingerprint or fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+            merged.append(question)
+
+    return {'questions': merged[:count], 'failed_chunks': len(errors)}
@@ -0,0 +1,108 @@
+"""
+Dashboard read paths
+Aggregates and pages are computed in SQL so dashboard cost stays flat as quizzes and submissions grow.
+"""
+
+from sqlalchemy import select, func, exists
+from sqlalchemy.orm import joinedload, selectinload
+from controller.database import db
+from controller.models import User, Quiz, Question, QuizSubmission
+
+
+def _question_count():
+    return select(func.count(Question.id)).where(Question.quiz_id == Quiz.id).correlate(Quiz).scalar_subquery()
+
+
+def pending_quizzes_page(student_id: int, before_id: int = None, page_size: int = 20) -> tuple:
+    """
+    One page of published quizzes the student hasn't submitted, newest first
+
+    Uses keyset pagination on Quiz.id: pass the returned cursor as before_id for the next page.
+
+    Returns:
+        ([(quiz, question_count), ...], next cursor or None)
+    """
+    submitted = exists().where(
+        QuizSubmission.quiz_id == Quiz.id,
+        QuizSubmission.student_id == student_id
+    )
+    query = db.session.query(Quiz, _question_count()).filter(Quiz.is_published.is_(True), ~submitted)
+    if before_id is not None:
+        query = query.filter(Quiz.id < before_id)
+
+    rows = query.order_by(Quiz.id.desc()).limit(page_size + 1).all()
+    next_cursor = rows[page_size - 1][0].id if len(rows) > page_size else None
+    return [tuple(row) for row in rows[:page_size]], next_cursor
+
+
+def completed_submissions_page(student_id: int, before_id: int = None, page_size: int = 20) -> tuple:
+    """
+    One page of the student's submissions, newest first, with quiz titles loaded in the same query
+
+    Returns:
+        ([submission, ...], next cursor or None)
+    """
+    query = QuizSubmission.query.options(
+        joinedload(QuizSubmission.quiz).load_only(Quiz.id, Quiz.title)
+    ).filter(QuizSubmission.student_id == student_id)
+    if before_id is not None:
+        query = query.filter(QuizSubmission.id < before_id)
+
+    submissions = query.order_by(QuizSubmission.id.desc()).limit(page_size + 1).all()
+    next_cursor = submissions[page_size - 1].id if len(submissions) > page_size else None
+    return submissions[:page_size], next_cursor
+
+
+def teacher_quiz_summaries(teacher_id: int) -> list:
+    """
+    The teacher's quizzes with question count, submission count and average score percentage
+
+    Counts are grouped per quiz in SQL subqueries joined onto the quiz rows, so no Question or
+    QuizSubmission objects are loaded.
+
+    Returns:
+        [(quiz, question_count, submission_count, average_percentage or None), ...]
+    """
+    question_counts = db.session.query(
+        Question.quiz_id.label('quiz_id'),
+        func.count(Question.id).label('question_count')
+    ).join(Quiz, Question.quiz_id == Quiz.id).filter(
+        Quiz.teacher_id == teacher_id
+    ).group_by(Question.quiz_id).subquery()
+
+    submission_stats = db.session.query(
+        QuizSubmission.quiz_id.label('quiz_id'),
+        func.count(QuizSubmission.id).label('submission_count'),
+        func.avg(QuizSubmission.score * 100.0 / func.nullif(QuizSubmission.total_marks, 0)).label('average_percentage')
+    ).join(Quiz, QuizSubmission.quiz_id == Quiz.id).filter(
+        Quiz.teacher_id == teacher_id
+    ).group_by(QuizSubmission.quiz_id).subquery()
+
+    rows = db.session.query(
+        Quiz,
+        func.coalesce(question_counts.c.question_count, 0),
+        func.coalesce(submission_stats.c.submission_count, 0),
+        submission_stats.c.average_percentage
+    ).outerjoin(
+        question_counts, question_counts.c.quiz_id == Quiz.id
+    ).outerjoin(
+        submission_stats, submission_stats.c.quiz_id == Quiz.id
+    ).filter(Quiz.teacher_id == teacher_id).order_by(Quiz.id).all()
+
+    return [tuple(row) for row in rows]
+
+
+def users_page(after_id: int = None, page_size: int = 100) -> tuple:
+    """
+    One page of users in id order with their roles loaded in bulk (one extra query per page)
+
+    Returns:
+        ([user, ...], next cursor or None)
+    """
+    query = User.query.options(selectinload(User.roles))
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+
+    users = query.order_by(User.id).limit(page_size + 1).all()
+    next_cursor = users[page_size - 1].id if len(users) > page_size else None
+    return users[:page_size], next_cursor
@@ -1,3 +1,28 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
+
+
+def configure_sqlite_engine(app):
+    """
+    Apply the SQLite concurrency profile (WAL, synchronous, busy timeout, mmap) on every new connection
+    """
+    with app.app_context():
+        engine = db.engine
+        if engine.dialect.name != 'sqlite':
+            return
+
+        pragmas = [
+            f"PRAGMA journal_mode={app.config.get('SQLITE_JOURNAL_MODE', 'WAL')}",
+            f"PRAGMA synchronous={app.config.get('SQLITE_SYNCHRONOUS', 'NORMAL')}",
+            f"PRAGMA busy_timeout={int(app.config.get('SQLITE_BUSY_TIMEOUT_MS', 5000))}",
+            f"PRAGMA mmap_size={int(app.config.get('SQLITE_MMAP_SIZE', 0))}",
+        ]
+
+        @event.listens_for(engine, 'connect')
+        def set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
@@ -0,0 +1,171 @@
+"""
+Autosaved drafts of in-progress quiz attempts
+Autosave requests only merge answer deltas into an in-memory buffer; a background thread writes the
+buffer to the attempt_draft table every few seconds, so many autosaves from many students become one
+short transaction. The buffer is per process, so the take-quiz form still posts every answer on submit;
+the draft restores answers when the page is reopened and fills in any the form didn't post.
+"""
+
+import atexit
+import json
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import delete, insert, tuple_, update
+from controller.database import db
+from controller.models import AttemptDraft
+
+MAX_ANSWER_LENGTH = 10000
+FLUSH_CHUNK_SIZE = 500
+# Recently submitted attempts, so a late autosave doesn't recreate their draft
+CLOSED_ATTEMPTS_KEPT = 100000
+
+# (quiz_id, student_id) -> {'question_<id>': value} not yet written to the database
+_pending = {}
+_closed = {}
+_lock = threading.Lock()
+# Held while a batch is written, so a submitted attempt's draft can't be written back after it is discarded
+_flush_lock = threading.Lock()
+_app = None
+
+
+def record_draft_answers(quiz_id: int, student_id: int, changes: dict, allowed_fields) -> bool:
+    """
+    Merge changed answers into the attempt's buffered draft; the latest value per question wins
+
+    Args:
+        changes: {'question_<id>': value} as the take-quiz form would post it
+        allowed_fields: Field names of the quiz's questions
+
+    Returns:
+        False if the attempt was already submitted
+
+    Raises:
+        ValueError: for unknown questions or values that aren't short strings
+    """
+    for field, value in changes.items():
+        if field not in allowed_fields:
+            raise ValueError(f'Unknown question: {field}')
+        if not isinstance(value, str) or len(value) > MAX_ANSWER_LENGTH:
+            raise ValueError(f'Answers must be text of at most {MAX_ANSWER_LENGTH} characters')
+
+    key = (quiz_id, student_id)
+    with _lock:
+        if key in _closed:
+            return False
+        _pending.setdefault(key, {}).update(changes)
+    return True
+
+
+def get_draft(quiz_id: int, student_id: int) -> dict:
+    """
+    The attempt's saved answers, including autosaves not yet written to the database
+
+    Always reads the attempt_draft row, since autosaves may have been buffered and written by another process.
+    """
+    key = (quiz_id, student_id)
+    answers = {}
+    # A batch being written is in neither the buffer nor the table until it commits
+    with _flush_lock:
+        draft = db.session.query(AttemptDraft.answers).filter_by(quiz_id=quiz_id, student_id=student_id).first()
+        if draft:
+            answers = json.loads(draft.answers)
+        with _lock:
+            answers.update(_pending.get(key, {}))
+    return answers
+
+
+def discard_draft(quiz_id: int, student_id: int):
+    """
+    Drop an attempt's draft once it has been submitted, and ignore later autosaves for it
+    """
+    key = (quiz_id, student_id)
+    with _flush_lock:
+        with _lock:
+            _pending.pop(key, None)
+            _closed[key] = True
+            if len(_closed) > CLOSED_ATTEMPTS_KEPT:
+                del _closed[next(iter(_closed))]
+        db.session.execute(delete(AttemptDraft).where(
+            AttemptDraft.quiz_id == quiz_id, AttemptDraft.student_id == student_id
+        ))
+        db.session.commit()
+
+
+def flush_drafts() -> int:
+    """
+    Write all buffered autosaves: one SELECT of the affected drafts, then one bulk INSERT and one bulk UPDATE
+
+    On failure the batch goes back into the buffer (under any newer changes) and the error is raised.
+
+    Returns:
+        Number of drafts written
+    """
+    global _pending
+    with _flush_lock:
+        with _lock:
+            batch, _pending = _pending, {}
+        if not batch:
+            return 0
+
+        try:
+            keys = list(batch)
+            existing = {}
+            for start in range(0, len(keys), FLUSH_CHUNK_SIZE):
+                rows = db.session.query(
+                    AttemptDraft.id, AttemptDraft.quiz_id, AttemptDraft.student_id, AttemptDraft.answers
+                ).filter(
+                    tuple_(AttemptDraft.quiz_id, AttemptDraft.student_id).in_(keys[start:start + FLUSH_CHUNK_SIZE])
+                ).all()
+                existing.update({(row.quiz_id, row.student_id): row for row in rows})
+
+            now = datetime.utcnow()
+            inserts, updates = [], []
+            for (quiz_id, student_id), changes in batch.items():
+                row = existing.get((quiz_id, student_id))
+                if row is None:
+                    inserts.append({'quiz_id': quiz_id, 'student_id': student_id,
+                                    'answers': json.dumps(changes), 'updated_at': now})
+                else:
+                    answers = json.loads(row.answers)
+                    answers.update(changes)
+                    updates.append({'id': row.id, 'answers': json.dumps(answers), 'updated_at': now})
+
+            if inserts:
+                db.session.execute(insert(AttemptDraft.__table__), inserts)
+            if updates:
+                db.session.execute(update(AttemptDraft), updates)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            with _lock:
+                for key, changes in batch.items():
+                    _pending[key] = dict(changes, **_pending.get(key, {}))
+            raise
+    return len(batch)
+
+
+def _flush_with_app_context():
+    with _app.app_context():
+        try:
+            flush_drafts()
+        except Exception as e:
+            print(f"⚠️  Draft flush failed, will retry: {str(e)}")
+
+
+def _flush_loop(interval: float):
+    while True:
+        time.sleep(interval)
+        _flush_with_app_context()
+
+
+def init_drafts(app):
+    """
+    Start the background flusher (also flushed at exit)
+    """
+    global _app
+    _app = app
+
+    interval = app.config.get('DRAFT_FLUSH_INTERVAL_SECONDS', 3)
+    threading.Thread(target=_flush_loop, args=(interval,), name='draft-flusher', daemon=True).start()
+    atexit.register(_flush_with_app_context)
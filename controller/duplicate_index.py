@@ -0,0 +1,172 @@
+"""
+Near-duplicate question detection
+Keeps a MinHash/LSH index of each teacher's questions in memory, so a new question is checked
+against all of the teacher's quizzes by probing a few hash buckets instead of scanning every
+stored question text.
+"""
+
+import re
+import threading
+import zlib
+import numpy as np
+from controller.database import db
+from controller.models import Question, Quiz
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+DEFAULT_THRESHOLD = 0.8
+
+_PRIME = np.uint64((1 << 61) - 1)
+_random = np.random.RandomState(20240607)
+_HASH_A = _random.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_HASH_B = _random.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def normalize_text(text: str) -> str:
+    text = str(text or '').lower()
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text).split())
+
+
+def _shingles(normalized: str) -> frozenset:
+    if len(normalized) <= SHINGLE_SIZE:
+        return frozenset([normalized]) if normalized else frozenset()
+    return frozenset(normalized[i:i + SHINGLE_SIZE] for i in range(len(normalized) - SHINGLE_SIZE + 1))
+
+
+def _signature(shingles: frozenset) -> np.ndarray:
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # One universal hash per permutation; 31-bit multipliers and 32-bit hashes cannot overflow uint64
+    return ((np.outer(_HASH_A, hashes) + _HASH_B[:, None]) % _PRIME).min(axis=1)
+
+
+def _band_keys(signature: np.ndarray) -> list:
+    return [(band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].tobytes()) for band in range(BANDS)]
+
+
+class SimilarityIndex:
+    """
+    MinHash index over question texts with locality-sensitive hashing (16 bands of 4 rows)
+
+    Candidates sharing a band bucket are confirmed with the exact Jaccard similarity of
+    their character shingles, so matches never rest on the estimate alone.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.buckets = {}
+
+    def add(self, question_id, quiz_id, question_text: str):
+        self.remove(question_id)
+        shingles = _shingles(normalize_text(question_text))
+        if not shingles:
+            return
+        keys = _band_keys(_signature(shingles))
+        self.entries[question_id] = {
+            'quiz_id': quiz_id,
+            'question_text': question_text,
+            'shingles': shingles,
+            'keys': keys
+        }
+        for key in keys:
+            self.buckets.setdefault(key, set()).add(question_id)
+
+    def remove(self, question_id):
+        entry = self.entries.pop(question_id, None)
+        if entry is None:
+            return
+        for key in entry['keys']:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.discard(question_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def remove_quiz(self, quiz_id):
+        for question_id in [qid for qid, entry in self.entries.items() if entry['quiz_id'] == quiz_id]:
+            self.remove(question_id)
+
+    def find(self, question_text: str, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Return the most similar stored question at or above threshold, or None
+        """
+        shingles = _shingles(normalize_text(question_text))
+        if not shingles:
+            return None
+
+        candidates = set()
+        for key in _band_keys(_signature(shingles)):
+            candidates.update(self.buckets.get(key, ()))
+
+        best = None
+        for question_id in candidates:
+            entry = self.entries[question_id]
+            similarity = len(shingles & entry['shingles']) / len(shingles | entry['shingles'])
+            if similarity >= threshold and (best is None or similarity > best['similarity']):
+                best = {
+                    'question_id': question_id,
+                    'quiz_id': entry['quiz_id'],
+                    'question_text': entry['question_text'],
+                    'similarity': round(similarity, 3)
+                }
+        return best
+
+
+def _teacher_index(teacher_id) -> SimilarityIndex:
+    # Built from the database on first use, then kept current by the add/remove helpers below
+    index = _indexes.get(teacher_id)
+    if index is not None:
+        return index
+
+    index = SimilarityIndex()
+    rows = db.session.query(Question.id, Question.quiz_id, Question.question_text).join(
+        Quiz, Question.quiz_id == Quiz.id
+    ).filter(Quiz.teacher_id == teacher_id)
+    for question_id, quiz_id, question_text in rows:
+        index.add(question_id, quiz_id, question_text)
+
+    with _lock:
+        return _indexes.setdefault(teacher_id, index)
+
+
+def find_duplicate(teacher_id, question_text: str, threshold: float = DEFAULT_THRESHOLD):
+    """
+    Find a near-duplicate of question_text among all of a teacher's quizzes
+
+    Returns:
+        {'question_id', 'quiz_id', 'question_text', 'similarity'} or None
+    """
+    index = _teacher_index(teacher_id)
+    with _lock:
+        return index.find(question_text, threshold)
+
+
+def index_questions(teacher_id, questions):
+    """
+    Add saved Question objects to the teacher's index; call after the commit
+    """
+    index = _teacher_index(teacher_id)
+    with _lock:
+        for question in questions:
+            index.add(question.id, question.quiz_id, question.question_text)
+
+
+def unindex_question(teacher_id, question_id):
+    if teacher_id in _indexes:
+        with _lock:
+            _indexes[teacher_id].remove(question_id)
+
+
+def unindex_quiz(teacher_id, quiz_id):
+    if teacher_id in _indexes:
+        with _lock:
+            _indexes[teacher_id].remove_quiz(quiz_id)
+
+
+def drop_teacher_index(teacher_id):
+    with _lock:
+        _indexes.pop(teacher_id, None)
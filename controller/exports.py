@@ -0,0 +1,159 @@
+"""
+Streaming exports of quiz results
+Rows are read through a server-side cursor in fixed-size batches and written out as CSV or Parquet
+chunk by chunk, so memory stays flat and the first bytes go out before the query has finished.
+Parquet needs the optional pyarrow package.
+"""
+
+import csv
+import io
+from sqlalchemy import select
+from controller.database import db
+from controller.models import User, Question, Option, QuizSubmission, StudentAnswer
+
+BATCH_SIZE = 1000
+
+# Column names and types per export; types are used for the Parquet schema
+EXPORT_KINDS = {
+    'submissions': [
+        ('submission_id', 'int'), ('quiz_id', 'int'), ('student_id', 'int'), ('student_username', 'str'),
+        ('score', 'float'), ('total_marks', 'float'), ('submitted_at', 'datetime')
+    ],
+    'answers': [
+        ('answer_id', 'int'), ('quiz_id', 'int'), ('student_id', 'int'), ('student_username', 'str'),
+        ('question_id', 'int'), ('question_type', 'str'), ('question_text', 'str'),
+        ('selected_option_id', 'int'), ('selected_option_text', 'str'), ('answer_text', 'str'),
+        ('is_correct', 'bool'), ('marks_obtained', 'float'), ('question_marks', 'int'), ('grading_status', 'str')
+    ]
+}
+EXPORT_FORMATS = {'csv': 'text/csv', 'parquet': 'application/vnd.apache.parquet'}
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _statement(kind: str, quiz_id: int):
+    if kind == 'submissions':
+        return select(
+            QuizSubmission.id, QuizSubmission.quiz_id, QuizSubmission.student_id, User.username,
+            QuizSubmission.score, QuizSubmission.total_marks, QuizSubmission.submitted_at
+        ).join(User, QuizSubmission.student_id == User.id).where(
+            QuizSubmission.quiz_id == quiz_id
+        ).order_by(QuizSubmission.id)
+
+    return select(
+        StudentAnswer.id, StudentAnswer.quiz_id, StudentAnswer.student_id, User.username,
+        StudentAnswer.question_id, Question.question_type, Question.question_text,
+        StudentAnswer.selected_option_id, Option.option_text, StudentAnswer.answer_text,
+        StudentAnswer.is_correct, StudentAnswer.marks_obtained, Question.marks, StudentAnswer.grading_status
+    ).join(User, StudentAnswer.student_id == User.id).join(
+        Question, StudentAnswer.question_id == Question.id
+    ).outerjoin(
+        Option, StudentAnswer.selected_option_id == Option.id
+    ).where(StudentAnswer.quiz_id == quiz_id).order_by(StudentAnswer.id)
+
+
+def iter_batches(kind: str, quiz_id: int, batch_size: int = BATCH_SIZE):
+    """
+    Yield lists of row tuples for an export, batch_size rows at a time
+
+    yield_per streams from a server-side cursor where the driver supports one, so only the
+    current batch is held in memory.
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f'Unknown export: {kind}')
+
+    result = db.session.execute(_statement(kind, quiz_id).execution_options(yield_per=batch_size))
+    try:
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        result.close()
+
+
+def _csv_cell(value):
+    # Student-entered text (usernames, answers) must not run as a formula when the CSV is opened
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def stream_csv(kind: str, quiz_id: int, batch_size: int = BATCH_SIZE):
+    """
+    Yield the export as CSV text, one chunk per batch, header first
+
+    Text cells that a spreadsheet would read as a formula are prefixed with a quote.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in EXPORT_KINDS[kind]])
+    yield buffer.getvalue()
+
+    for batch in iter_batches(kind, quiz_id, batch_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_csv_cell(value) for value in row] for row in batch)
+        yield buffer.getvalue()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back to the caller instead of keeping them
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def stream_parquet(kind: str, quiz_id: int, batch_size: int = BATCH_SIZE):
+    """
+    Yield the export as a Parquet file, one row group per batch
+
+    Requires pyarrow. The schema is fixed up front, so a batch whose column is all nulls
+    still matches the rest of the file.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    types = {'int': pa.int64(), 'str': pa.string(), 'float': pa.float64(), 'bool': pa.bool_(),
+             'datetime': pa.timestamp('us')}
+    schema = pa.schema([(name, types[kind_type]) for name, kind_type in EXPORT_KINDS[kind]])
+
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for batch in iter_batches(kind, quiz_id, batch_size):
+            columns = list(zip(*batch))
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema
+            ))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
@@ -0,0 +1,124 @@
+"""
+Cache for AI question generation
+Two tiers: an in-process LRU and a persistent table with TTL and size-based eviction.
+Keys are derived from the normalized prompt inputs plus the OpenRouter model.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from controller.database import db
+from controller.models import GenerationCacheEntry
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0}
+
+
+def _normalize(value) -> str:
+    return ' '.join(str(value or '').split()).lower()
+
+
+def cache_key(model: str, topic, question_type, count, marks, difficulty, syllabus_scope, output_language,
+              part=None) -> str:
+    """
+    Stable key for a generation request; whitespace and case differences map to the same key
+    """
+    parts = {
+        'model': model,
+        'topic': _normalize(topic),
+        'question_type': question_type,
+        'count': int(count),
+        'marks': int(marks),
+        'difficulty': _normalize(difficulty),
+        'syllabus_scope': _normalize(syllabus_scope),
+        'output_language': _normalize(output_language),
+        'part': list(part) if part else None,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _remember(key: str, response: str, created_at: datetime, config):
+    with _lock:
+        _memory[key] = (response, created_at)
+        _memory.move_to_end(key)
+        while len(_memory) > config.get('GENERATION_CACHE_MEMORY_ENTRIES', 256):
+            _memory.popitem(last=False)
+
+
+def get_cached_questions(key: str, config):
+    """
+    Return a fresh copy of the cached questions for a key, or None on a miss
+    """
+    ttl = timedelta(seconds=config.get('GENERATION_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    now = datetime.utcnow()
+
+    with _lock:
+        cached = _memory.get(key)
+        if cached and now - cached[1] <= ttl:
+            _memory.move_to_end(key)
+            _stats['memory_hits'] += 1
+            return json.loads(cached[0])
+        _memory.pop(key, None)
+
+    try:
+        entry = db.session.get(GenerationCacheEntry, key)
+        if entry and now - entry.created_at <= ttl:
+            entry.last_used_at = now
+            db.session.commit()
+            with _lock:
+                _stats['disk_hits'] += 1
+            _remember(key, entry.response, entry.created_at, config)
+            return json.loads(entry.response)
+    except Exception:
+        db.session.rollback()
+
+    with _lock:
+        _stats['misses'] += 1
+    return None
+
+
+def store_questions(key: str, model: str, questions: list, config):
+    """
+    Save generated questions in both tiers and evict the least recently used disk entries
+    """
+    response = json.dumps(questions)
+    now = datetime.utcnow()
+    _remember(key, response, now, config)
+
+    try:
+        db.session.merge(GenerationCacheEntry(
+            key=key, model=model, response=response, created_at=now, last_used_at=now
+        ))
+        db.session.flush()
+
+        ttl = timedelta(seconds=config.get('GENERATION_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+        GenerationCacheEntry.query.filter(
+            GenerationCacheEntry.created_at < now - ttl
+        ).delete(synchronize_session=False)
+
+        max_entries = config.get('GENERATION_CACHE_MAX_ENTRIES', 5000)
+        overflow = GenerationCacheEntry.query.count() - max_entries
+        if overflow > 0:
+            oldest = db.session.query(GenerationCacheEntry.key).order_by(
+                GenerationCacheEntry.last_used_at
+            ).limit(overflow).subquery()
+            GenerationCacheEntry.query.filter(
+                GenerationCacheEntry.key.in_(db.session.query(oldest.c.key))
+            ).delete(synchronize_session=False)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+    with _lock:
+        _stats['stores'] += 1
+
+
+def cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        stats['memory_entries'] = len(_memory)
+    return stats
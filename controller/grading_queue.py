@@ -0,0 +1,158 @@
+"""
+Manual grading queue for short answers
+Groups a quiz's short answers by question and normalized text, so identical answers are graded
+together: one set-based UPDATE per awarded mark value, then one score refresh for the affected submissions.
+"""
+
+import math
+from sqlalchemy import update
+from controller.database import db
+from controller.models import Question, StudentAnswer
+from controller.short_answer_grading import (
+    GRADED_MANUAL, GRADED_REVIEW, normalize_answer, same_answer, similarity_scores
+)
+from controller.submissions import bump_grading_generation, refresh_submission_scores
+
+# Clusters with no manual or confident automatic grade yet
+PENDING_STATUSES = (None, GRADED_REVIEW)
+UPDATE_CHUNK_SIZE = 500
+
+
+def grading_queue(quiz_id: int, include_graded: bool = False) -> list:
+    """
+    Short answers of a quiz, clustered by question and normalized answer
+
+    Args:
+        include_graded: Also list clusters whose answers are all graded (auto-accepted/rejected or manual)
+
+    Returns:
+        One dict per short-answer question, in question order:
+        {'question_id', 'question_text', 'correct_answer', 'marks', 'answers', 'pending', 'clusters'}
+        where clusters are {'key', 'sample', 'count', 'pending', 'marks', 'status', 'similarity'},
+        most frequent first; marks is None when answers in the cluster were graded differently.
+    """
+    questions = db.session.query(Question.id, Question.question_text, Question.correct_answer, Question.marks).filter(
+        Question.quiz_id == quiz_id, Question.question_type == 'short_answer'
+    ).order_by(Question.id).all()
+    if not questions:
+        return []
+
+    rows = db.session.query(
+        StudentAnswer.question_id, StudentAnswer.answer_text, StudentAnswer.marks_obtained,
+        StudentAnswer.grading_status
+    ).filter(
+        StudentAnswer.quiz_id == quiz_id, StudentAnswer.question_id.in_([question.id for question in questions])
+    ).all()
+
+    clusters = {}
+    for question_id, answer_text, marks_obtained, grading_status in rows:
+        key = normalize_answer(answer_text)
+        cluster = clusters.get((question_id, key))
+        if cluster is None:
+            cluster = clusters[(question_id, key)] = {
+                'key': key, 'samples': {}, 'count': 0, 'pending': 0, 'marks': set(), 'statuses': set()
+            }
+        sample = (answer_text or '').strip()
+        cluster['samples'][sample] = cluster['samples'].get(sample, 0) + 1
+        cluster['count'] += 1
+        cluster['pending'] += grading_status in PENDING_STATUSES
+        cluster['marks'].add(marks_obtained or 0)
+        cluster['statuses'].add(grading_status)
+
+    # How close each cluster is to the expected answer, to help the teacher scan the queue
+    references = [normalize_answer(question.correct_answer) for question in questions]
+    position = {question.id: i for i, question in enumerate(questions)}
+    scored = [(question_id, key) for question_id, key in clusters if key and references[position[question_id]]]
+    similarity = dict(zip(scored, similarity_scores(
+        [key for _, key in scored], references, [position[question_id] for question_id, _ in scored]
+    ).tolist()))
+
+    groups = {question.id: {
+        'question_id': question.id,
+        'question_text': question.question_text,
+        'correct_answer': question.correct_answer,
+        'marks': question.marks or 0,
+        'answers': 0,
+        'pending': 0,
+        'clusters': []
+    } for question in questions}
+
+    for (question_id, key), cluster in clusters.items():
+        group = groups[question_id]
+        group['answers'] += cluster['count']
+        group['pending'] += cluster['pending']
+        if not include_graded and not cluster['pending']:
+            continue
+        statuses = cluster['statuses']
+        group['clusters'].append({
+            'key': key,
+            'sample': max(cluster['samples'].items(), key=lambda item: item[1])[0],
+            'count': cluster['count'],
+            'pending': cluster['pending'],
+            'marks': next(iter(cluster['marks'])) if len(cluster['marks']) == 1 else None,
+            'status': next(iter(statuses)) if len(statuses) == 1 else 'mixed',
+            'similarity': 1.0 if same_answer(key, references[position[question_id]])
+            else round(similarity.get((question_id, key), 0.0), 2),
+        })
+
+    for group in groups.values():
+        group['clusters'].sort(key=lambda cluster: (-cluster['count'], cluster['key']))
+    return list(groups.values())
+
+
+def grade_clusters(quiz_id: int, question_id: int, awards: dict) -> dict:
+    """
+    Award marks to every answer in the given clusters of one question, then refresh the affected scores
+
+    Answers are matched by normalized text at grading time, so identical answers submitted after
+    the queue was loaded are graded too. Graded answers are marked 'manual' and skipped by the auto-grader.
+
+    Args:
+        awards: Normalized answer (cluster key) -> marks to award
+
+    Returns:
+        {'clusters', 'answers_updated', 'submissions_updated'}
+
+    Raises:
+        ValueError: for an unknown question or marks that aren't a number in 0..question marks
+    """
+    question = db.session.query(Question.id, Question.marks).filter(
+        Question.id == question_id, Question.quiz_id == quiz_id, Question.question_type == 'short_answer'
+    ).first()
+    if question is None:
+        raise ValueError('Short-answer question not found in this quiz')
+
+    full_marks = question.marks or 0
+    for marks in awards.values():
+        # NaN passes both comparisons below
+        if not math.isfinite(marks) or marks < 0 or marks > full_marks:
+            raise ValueError(f'Marks must be between 0 and {full_marks}')
+
+    answers = db.session.query(StudentAnswer.id, StudentAnswer.student_id, StudentAnswer.answer_text).filter(
+        StudentAnswer.quiz_id == quiz_id, StudentAnswer.question_id == question_id
+    ).all()
+
+    # Answer ids per awarded mark value, so each value is one UPDATE ... WHERE id IN (...)
+    ids_by_marks = {}
+    students = set()
+    for answer_id, student_id, answer_text in answers:
+        marks = awards.get(normalize_answer(answer_text))
+        if marks is None:
+            continue
+        ids_by_marks.setdefault(float(marks), []).append(answer_id)
+        students.add(student_id)
+
+    summary = {'clusters': len(awards), 'answers_updated': 0, 'submissions_updated': 0}
+    for marks, answer_ids in ids_by_marks.items():
+        statement = update(StudentAnswer).values(
+            marks_obtained=marks, is_correct=marks >= full_marks, grading_status=GRADED_MANUAL
+        ).execution_options(synchronize_session=False)
+        for start in range(0, len(answer_ids), UPDATE_CHUNK_SIZE):
+            chunk = answer_ids[start:start + UPDATE_CHUNK_SIZE]
+            summary['answers_updated'] += db.session.execute(statement.where(StudentAnswer.id.in_(chunk))).rowcount
+
+    if students:
+        summary['submissions_updated'] = refresh_submission_scores(quiz_id, students)
+    db.session.commit()
+    bump_grading_generation(quiz_id)
+    return summary
@@ -0,0 +1,52 @@
+"""
+Cached role resolution for authorization
+Maps user id -> role name in process memory with a TTL, so protected routes don't query the
+user and user_role tables on every request. Entries are dropped when a user is deleted.
+"""
+
+import threading
+import time
+from controller.database import db
+from controller.models import Role, user_role
+
+MAX_ENTRIES = 10000
+
+_roles = {}
+_lock = threading.Lock()
+
+
+def remember_user_role(user_id: int, role_name: str, ttl_seconds: int):
+    with _lock:
+        now = time.monotonic()
+        if len(_roles) >= MAX_ENTRIES:
+            for stale_id in [key for key, (_, expires_at) in _roles.items() if expires_at <= now]:
+                del _roles[stale_id]
+            if len(_roles) >= MAX_ENTRIES:
+                _roles.clear()
+        _roles[user_id] = (role_name, now + ttl_seconds)
+
+
+def get_user_role(user_id: int, ttl_seconds: int):
+    """
+    Return the user's role name, or None if the user doesn't exist or has no role
+
+    Served from memory while fresh; otherwise one query over user_role and role.
+    Unknown users are not cached, since SQLite may reuse a deleted user's id.
+    """
+    cached = _roles.get(user_id)
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+
+    # Users have a single role; the ordering keeps the answer stable if one ever has several
+    role_name = db.session.query(Role.rolename).join(
+        user_role, user_role.c.role_id == Role.id
+    ).filter(user_role.c.user_id == user_id).order_by(Role.id).limit(1).scalar()
+
+    if role_name is not None:
+        remember_user_role(user_id, role_name, ttl_seconds)
+    return role_name
+
+
+def invalidate_user_role(user_id: int):
+    with _lock:
+        _roles.pop(user_id, None)
@@ -0,0 +1,182 @@
+"""
+Item analysis for quiz results
+Score distribution, per-question difficulty and discrimination, distractor rates and reliability,
+computed with pandas/NumPy from one query over the quiz's answers.
+"""
+
+import threading
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from controller.database import db
+from controller.models import Question, Option, QuizSubmission, StudentAnswer
+from controller.answer_key import answer_key_generation
+from controller.submissions import grading_generation
+
+HISTOGRAM_BINS = 10
+
+_cache = {}
+_lock = threading.Lock()
+
+
+def _number(value, digits=3):
+    # JSON has no NaN; undefined statistics (e.g. zero variance) become None
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), digits)
+
+
+def _signature(quiz_id: int) -> tuple:
+    # Changes when a submission arrives or is re-scored, when answers are re-graded (which can leave
+    # the score sum unchanged) or when the quiz's questions change
+    count, last_id, score_sum = db.session.query(
+        func.count(QuizSubmission.id), func.max(QuizSubmission.id), func.sum(QuizSubmission.score)
+    ).filter(QuizSubmission.quiz_id == quiz_id).one()
+    return count, last_id, score_sum, answer_key_generation(quiz_id), grading_generation(quiz_id)
+
+
+def _score_summary(scores: np.ndarray, totals: np.ndarray) -> dict:
+    percentages = np.divide(scores * 100.0, totals, out=np.zeros_like(scores), where=totals > 0)
+    counts, edges = np.histogram(percentages, bins=HISTOGRAM_BINS, range=(0, 100))
+    return {
+        'submissions': int(len(scores)),
+        'average_score': _number(scores.mean(), 1) if len(scores) else None,
+        'highest_score': _number(scores.max(), 1) if len(scores) else None,
+        'lowest_score': _number(scores.min(), 1) if len(scores) else None,
+        'average_percentage': _number(percentages.mean(), 1) if len(scores) else None,
+        'histogram': [
+            {'from': int(edges[i]), 'to': int(edges[i + 1]), 'count': int(counts[i])}
+            for i in range(HISTOGRAM_BINS)
+        ]
+    }
+
+
+def _item_discrimination(item_scores: np.ndarray, item_marks: np.ndarray) -> np.ndarray:
+    """
+    Point-biserial (item-rest) correlation per question column
+
+    Each item is correlated with the rest score (total minus the item) so it doesn't inflate its own index.
+    """
+    raw = item_scores * item_marks
+    rest = raw.sum(axis=1, keepdims=True) - raw
+    item_centered = item_scores - item_scores.mean(axis=0)
+    rest_centered = rest - rest.mean(axis=0)
+    covariance = (item_centered * rest_centered).mean(axis=0)
+    spread = item_scores.std(axis=0) * rest.std(axis=0)
+    return np.divide(covariance, spread, out=np.full(len(item_marks), np.nan), where=spread > 0)
+
+
+def _reliability(item_scores: np.ndarray, item_marks: np.ndarray) -> dict:
+    """
+    Cronbach's alpha over item marks; equal to KR-20 when every item is scored right/wrong
+    """
+    students, items = item_scores.shape
+    dichotomous = bool(np.isin(item_scores, (0.0, 1.0)).all())
+    method = 'KR-20' if dichotomous else "Cronbach's alpha"
+    if students < 2 or items < 2:
+        return {'method': method, 'coefficient': None}
+
+    raw = item_scores * item_marks
+    total_variance = raw.sum(axis=1).var()
+    if total_variance == 0:
+        return {'method': method, 'coefficient': None}
+    alpha = items / (items - 1) * (1 - raw.var(axis=0).sum() / total_variance)
+    return {'method': method, 'coefficient': _number(alpha)}
+
+
+def compute_item_analysis(quiz_id: int) -> dict:
+    """
+    Compute item statistics for a quiz (uncached)
+
+    Returns:
+        JSON-serializable dict with 'summary', 'reliability' and one entry per question in 'questions'
+    """
+    submissions = db.session.query(
+        QuizSubmission.student_id, QuizSubmission.score, QuizSubmission.total_marks
+    ).filter(QuizSubmission.quiz_id == quiz_id).all()
+    questions = db.session.query(
+        Question.id, Question.question_text, Question.question_type, Question.marks
+    ).filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+    options = db.session.query(
+        Option.id, Option.question_id, Option.option_text, Option.is_correct
+    ).join(Question, Option.question_id == Question.id).filter(
+        Question.quiz_id == quiz_id
+    ).order_by(Option.id).all()
+    answers = pd.DataFrame(db.session.query(
+        StudentAnswer.student_id, StudentAnswer.question_id, StudentAnswer.selected_option_id,
+        StudentAnswer.marks_obtained
+    ).filter(StudentAnswer.quiz_id == quiz_id).all(),
+        columns=['student_id', 'question_id', 'selected_option_id', 'marks_obtained'])
+
+    submission_frame = pd.DataFrame(submissions, columns=['student_id', 'score', 'total_marks'])
+    summary = _score_summary(
+        submission_frame['score'].fillna(0).to_numpy(dtype=np.float64),
+        submission_frame['total_marks'].fillna(0).to_numpy(dtype=np.float64)
+    )
+
+    student_ids = submission_frame['student_id'].tolist()
+    question_ids = [question.id for question in questions]
+    item_marks = np.array([question.marks or 0 for question in questions], dtype=np.float64)
+
+    # Students x questions matrix of the fraction of marks earned; unanswered questions count as 0
+    earned = answers.pivot_table(
+        index='student_id', columns='question_id', values='marks_obtained', aggfunc='sum', fill_value=0
+    ).reindex(index=student_ids, columns=question_ids, fill_value=0).fillna(0)
+    item_scores = np.divide(
+        earned.to_numpy(dtype=np.float64), item_marks,
+        out=np.zeros((len(student_ids), len(question_ids))), where=item_marks > 0
+    )
+
+    has_students = len(student_ids) > 0
+    difficulty = item_scores.mean(axis=0) if has_students else np.full(len(question_ids), np.nan)
+    discrimination = (
+        _item_discrimination(item_scores, item_marks) if has_students else np.full(len(question_ids), np.nan)
+    )
+
+    selections = answers.dropna(subset=['selected_option_id']).groupby('selected_option_id').size()
+    options_by_question = {}
+    for option_id, question_id, option_text, is_correct in options:
+        count = int(selections.get(option_id, 0))
+        options_by_question.setdefault(question_id, []).append({
+            'option_id': option_id,
+            'option_text': option_text,
+            'is_correct': bool(is_correct),
+            'count': count,
+            'rate': _number(count / len(student_ids)) if has_students else None
+        })
+
+    answered = answers.groupby('question_id').size()
+    question_stats = []
+    for index, question in enumerate(questions):
+        question_stats.append({
+            'question_id': question.id,
+            'question_text': question.question_text,
+            'question_type': question.question_type,
+            'marks': question.marks,
+            'responses': int(answered.get(question.id, 0)),
+            'difficulty': _number(difficulty[index]),
+            'discrimination': _number(discrimination[index]),
+            'options': options_by_question.get(question.id, [])
+        })
+
+    return {
+        'quiz_id': quiz_id,
+        'summary': summary,
+        'reliability': _reliability(item_scores, item_marks),
+        'questions': question_stats
+    }
+
+
+def get_item_analysis(quiz_id: int) -> dict:
+    """
+    Item analysis for a quiz, recomputed only when its submissions or questions have changed
+    """
+    signature = _signature(quiz_id)
+    cached = _cache.get(quiz_id)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    analysis = compute_item_analysis(quiz_id)
+    with _lock:
+        _cache[quiz_id] = (signature, analysis)
+    return analysis
@@ -0,0 +1,238 @@
+"""
+Background jobs
+Runs slow work (e.g. AI question generation) on a bounded, shared worker pool.
+Jobs and their results are stored in the background_job table so they survive restarts.
+"""
+
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import and_, update
+from controller.database import db
+from controller.models import BackgroundJob
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+_handlers = {}
+_executor = None
+_app = None
+
+# In-process progress of running jobs: job id -> {'items': [...], 'finished': bool, 'finished_at': float}
+_progress = {}
+_progress_changed = threading.Condition()
+PROGRESS_RETENTION_SECONDS = 300
+
+
+def job_handler(kind: str):
+    """
+    Register a function as the handler for a job kind
+
+    The handler receives the job's params dict, a report(item) callback for partial
+    results and the job id, runs inside an app context and returns a JSON-serializable result.
+    Raising an exception marks the job as failed. A handler that writes data should call
+    complete_job() in the same transaction, so nothing is saved for a job that has already timed out.
+    """
+    def decorator(f):
+        _handlers[kind] = f
+        return f
+    return decorator
+
+
+def init_jobs(app, timeout_seconds: int = None):
+    """
+    Create the shared worker pool and resume jobs left queued by a previous run
+
+    Jobs left running longer than timeout_seconds (e.g. by a restart or a debug reload) are marked as failed.
+    """
+    global _executor, _app
+    _app = app
+    _executor = ThreadPoolExecutor(
+        max_workers=app.config.get('JOB_MAX_WORKERS', 4),
+        thread_name_prefix='job-worker'
+    )
+
+    with app.app_context():
+        if timeout_seconds:
+            db.session.execute(
+                update(BackgroundJob)
+                .where(BackgroundJob.status == 'running', _started_before(timeout_seconds))
+                .values(
+                    status='failed',
+                    error=f'Job did not finish within {timeout_seconds} seconds (the server may have restarted).',
+                    finished_at=datetime.utcnow()
+                )
+            )
+            db.session.commit()
+        queued = db.session.query(BackgroundJob.id).filter_by(status='queued').all()
+    for (job_id,) in queued:
+        _executor.submit(_run_job, job_id)
+
+
+def enqueue_job(kind: str, owner_id: int, params: dict) -> str:
+    """
+    Store a new job and hand it to the worker pool
+
+    Returns:
+        The job id
+    """
+    if kind not in _handlers:
+        raise ValueError(f'Unknown job kind: {kind}')
+
+    job = BackgroundJob(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        owner_id=owner_id,
+        status='queued',
+        params=json.dumps(params)
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    _executor.submit(_run_job, job.id)
+    return job.id
+
+
+def count_active_jobs(owner_id: int, timeout_seconds: int = None) -> int:
+    """
+    Queued and running jobs of a user; jobs running longer than timeout_seconds are not counted
+    """
+    query = BackgroundJob.query.filter(
+        BackgroundJob.owner_id == owner_id,
+        BackgroundJob.status.in_(ACTIVE_STATUSES)
+    )
+    if timeout_seconds:
+        query = query.filter(~and_(BackgroundJob.status == 'running', _started_before(timeout_seconds)))
+    return query.count()
+
+
+def get_job(job_id: str, timeout_seconds: int = None):
+    """
+    Load a job; a job running longer than timeout_seconds is marked as failed
+    """
+    job = db.session.get(BackgroundJob, job_id)
+    if job and timeout_seconds and job.status == 'running' and job.started_at:
+        if datetime.utcnow() - job.started_at > timedelta(seconds=timeout_seconds):
+            _finish_job(job_id, 'failed', error=(
+                f"AI generation exceeded {timeout_seconds} seconds. "
+                "Please try fewer questions or a shorter topic."
+            ))
+            db.session.expire(job)
+    return job
+
+
+def _started_before(timeout_seconds: int):
+    return BackgroundJob.started_at < datetime.utcnow() - timedelta(seconds=timeout_seconds)
+
+
+def complete_job(job_id: str, result) -> bool:
+    """
+    Mark a running job as succeeded in the caller's transaction; the caller commits
+
+    Returns:
+        False if the job already finished (e.g. timed out), in which case the caller should roll back
+    """
+    return db.session.execute(_finish_statement(job_id, 'succeeded', result=result)).rowcount == 1
+
+
+def job_params(job) -> dict:
+    return json.loads(job.params) if job.params else {}
+
+
+def job_result(job):
+    return json.loads(job.result) if job.result else None
+
+
+def report_progress(job_id: str, item):
+    """
+    Publish a partial result of a running job to progress listeners in this process
+    """
+    with _progress_changed:
+        entry = _progress.setdefault(job_id, {'items': [], 'finished': False, 'finished_at': None})
+        entry['items'].append(item)
+        _progress_changed.notify_all()
+
+
+def wait_for_progress(job_id: str, since: int, timeout: float) -> tuple:
+    """
+    Wait until a job has more than `since` partial results or has finished
+
+    Returns:
+        (new items, finished) - finished is None when this process has no progress for the job
+        (e.g. it runs in another process), so callers should fall back to the job table
+    """
+    with _progress_changed:
+        _progress_changed.wait_for(
+            lambda: job_id in _progress and (
+                len(_progress[job_id]['items']) > since or _progress[job_id]['finished']
+            ),
+            timeout=timeout
+        )
+        entry = _progress.get(job_id)
+        if entry is None:
+            return [], None
+        return entry['items'][since:], entry['finished']
+
+
+def _end_progress(job_id: str):
+    with _progress_changed:
+        now = time.monotonic()
+        entry = _progress.setdefault(job_id, {'items': [], 'finished': False, 'finished_at': None})
+        entry['finished'] = True
+        entry['finished_at'] = now
+        for stale_id in [key for key, value in _progress.items()
+                         if value['finished'] and now - value['finished_at'] > PROGRESS_RETENTION_SECONDS]:
+            del _progress[stale_id]
+        _progress_changed.notify_all()
+
+
+def _finish_statement(job_id: str, status: str, result=None, error=None):
+    # Only a running job can finish, so a late result never overwrites a timeout
+    return (
+        update(BackgroundJob)
+        .where(BackgroundJob.id == job_id, BackgroundJob.status == 'running')
+        .values(
+            status=status,
+            result=json.dumps(result) if result is not None else None,
+            error=error,
+            finished_at=datetime.utcnow()
+        )
+    )
+
+
+def _finish_job(job_id: str, status: str, result=None, error=None) -> bool:
+    outcome = db.session.execute(_finish_statement(job_id, status, result, error))
+    db.session.commit()
+    return outcome.rowcount == 1
+
+
+def _run_job(job_id: str):
+    with _app.app_context():
+        # Claim the job atomically so it never runs twice (e.g. when resumed by several processes)
+        claimed = db.session.execute(
+            update(BackgroundJob)
+            .where(BackgroundJob.id == job_id, BackgroundJob.status == 'queued')
+            .values(status='running', started_at=datetime.utcnow())
+        )
+        db.session.commit()
+        if claimed.rowcount != 1:
+            return
+
+        job = db.session.get(BackgroundJob, job_id)
+        handler = _handlers.get(job.kind)
+        params = job_params(job)
+
+        try:
+            if handler is None:
+                raise ValueError(f'Unknown job kind: {job.kind}')
+            result = handler(params, lambda item: report_progress(job_id, item), job_id)
+        except Exception as e:
+            db.session.rollback()
+            _finish_job(job_id, 'failed', error=str(e))
+        else:
+            _finish_job(job_id, 'succeeded', result=result)
+        finally:
+            # Listeners reload from the job table, so only signal once the final status is stored
+            _end_progress(job_id)
@@ -0,0 +1,253 @@
+"""
+Request instrumentation
+Per-endpoint latency histograms, SQL statement counts and time (from engine events), template
+render time and OpenRouter call latency/outcome, kept in process and rendered in the Prometheus
+text exposition format. Recording is a few perf_counter() calls and one short lock per request,
+cheap enough to leave on during exams.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import request, before_render_template, template_rendered
+from sqlalchemy import event
+from controller.database import db
+from controller.generation_cache import cache_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+OPENROUTER_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0)
+
+# Statements run outside a request (background jobs, startup) are labelled with this endpoint
+BACKGROUND_ENDPOINT = '(background)'
+
+_lock = threading.Lock()
+_local = threading.local()
+_enabled = False
+
+# (metric name, sorted label items) -> [bucket counts..., sum, count] for histograms, value for counters
+_histograms = {}
+_counters = {}
+
+HELP = {
+    'quiz_http_requests_total': ('counter', 'Requests handled, by endpoint, method and status'),
+    'quiz_http_request_duration_seconds': ('histogram', 'Time to produce a response, by endpoint'),
+    'quiz_db_statements_per_request': ('histogram', 'SQL statements executed per request, by endpoint'),
+    'quiz_db_statements_total': ('counter', 'SQL statements executed, by endpoint'),
+    'quiz_db_statement_seconds_total': ('counter', 'Time spent executing SQL statements, by endpoint'),
+    'quiz_template_render_seconds': ('histogram', 'Jinja template render time, by template'),
+    'quiz_openrouter_request_duration_seconds': ('histogram', 'OpenRouter call duration, by mode and outcome'),
+    'quiz_generation_cache_lookups_total': ('counter', 'AI generation cache lookups, by result'),
+    'quiz_generation_cache_stores_total': ('counter', 'AI generation results stored in the cache'),
+    'quiz_generation_cache_memory_entries': ('gauge', 'AI generation results held in the in-memory cache'),
+}
+
+
+def _observe(name: str, labels: tuple, value: float, buckets: tuple):
+    # Caller holds _lock
+    key = (name, labels)
+    series = _histograms.get(key)
+    if series is None:
+        series = _histograms[key] = [0] * (len(buckets) + 2)
+    index = bisect_left(buckets, value)
+    if index < len(buckets):
+        series[index] += 1
+    series[-2] += value
+    series[-1] += 1
+
+
+def _increment(name: str, labels: tuple, amount=1):
+    # Caller holds _lock
+    key = (name, labels)
+    _counters[key] = _counters.get(key, 0) + amount
+
+
+def _bucket_bounds(name: str) -> tuple:
+    if name == 'quiz_db_statements_per_request':
+        return STATEMENT_BUCKETS
+    if name == 'quiz_openrouter_request_duration_seconds':
+        return OPENROUTER_BUCKETS
+    return LATENCY_BUCKETS
+
+
+# -------------------
+# RECORDING
+# -------------------
+def _before_request():
+    _local.request = {'start': time.perf_counter(), 'statements': 0, 'statement_seconds': 0.0, 'status': 500}
+
+
+def _after_request(response):
+    state = getattr(_local, 'request', None)
+    if state is not None:
+        state['status'] = response.status_code
+    return response
+
+
+def _teardown_request(exception=None):
+    state = getattr(_local, 'request', None)
+    if state is None:
+        return
+    _local.request = None
+
+    elapsed = time.perf_counter() - state['start']
+    # url_rule keeps the label set bounded; unmatched URLs share one label
+    endpoint = request.url_rule.endpoint if request.url_rule else '(unmatched)'
+    labels = (('endpoint', endpoint),)
+    with _lock:
+        _increment('quiz_http_requests_total',
+                   (('endpoint', endpoint), ('method', request.method), ('status', str(state['status']))))
+        _observe('quiz_http_request_duration_seconds', labels, elapsed, LATENCY_BUCKETS)
+        _observe('quiz_db_statements_per_request', labels, state['statements'], STATEMENT_BUCKETS)
+        _increment('quiz_db_statements_total', labels, state['statements'])
+        _increment('quiz_db_statement_seconds_total', labels, state['statement_seconds'])
+
+
+def _before_cursor_execute(*args):
+    _local.statement_start = time.perf_counter()
+
+
+def _after_cursor_execute(*args):
+    start = getattr(_local, 'statement_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    _local.statement_start = None
+
+    state = getattr(_local, 'request', None)
+    if state is not None:
+        state['statements'] += 1
+        state['statement_seconds'] += elapsed
+        return
+    labels = (('endpoint', BACKGROUND_ENDPOINT),)
+    with _lock:
+        _increment('quiz_db_statements_total', labels)
+        _increment('quiz_db_statement_seconds_total', labels, elapsed)
+
+
+def _before_render_template(sender, template, context, **extra):
+    stack = getattr(_local, 'templates', None)
+    if stack is None:
+        stack = _local.templates = []
+    stack.append(time.perf_counter())
+
+
+def _template_rendered(sender, template, context, **extra):
+    stack = getattr(_local, 'templates', None)
+    if not stack:
+        return
+    elapsed = time.perf_counter() - stack.pop()
+    with _lock:
+        _observe('quiz_template_render_seconds', (('template', template.name or '(string)'),), elapsed,
+                 LATENCY_BUCKETS)
+
+
+class _OpenRouterCall:
+    outcome = None
+
+
+@contextmanager
+def openrouter_call(mode: str):
+    """
+    Time one OpenRouter call; set .outcome (e.g. 'timeout', 'http_429') before raising
+
+    Without an explicit outcome, a clean exit counts as 'ok', an abandoned stream as
+    'cancelled' and any other exception as 'error'.
+    """
+    call = _OpenRouterCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    except GeneratorExit:
+        call.outcome = call.outcome or 'cancelled'
+        raise
+    except BaseException:
+        call.outcome = call.outcome or 'error'
+        raise
+    finally:
+        if _enabled:
+            with _lock:
+                _observe('quiz_openrouter_request_duration_seconds',
+                         (('mode', mode), ('outcome', call.outcome or 'ok')),
+                         time.perf_counter() - start, OPENROUTER_BUCKETS)
+
+
+def init_metrics(app):
+    """
+    Hook request, SQL and template instrumentation into the app (no-op if METRICS_ENABLED is off)
+    """
+    global _enabled
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    _enabled = True
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    before_render_template.connect(_before_render_template, app)
+    template_rendered.connect(_template_rendered, app)
+
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(db.engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+# -------------------
+# EXPOSITION
+# -------------------
+def _format_labels(labels: tuple, extra: tuple = ()) -> str:
+    items = labels + extra
+    if not items:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in items
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def _format_number(value) -> str:
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def render_metrics() -> str:
+    """
+    All metrics in the Prometheus text exposition format (version 0.0.4)
+    """
+    with _lock:
+        histograms = {key: list(series) for key, series in _histograms.items()}
+        counters = dict(_counters)
+
+    # The generation cache keeps its own counters
+    generation_cache = cache_stats()
+    for result, stat in (('memory_hit', 'memory_hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses')):
+        counters[('quiz_generation_cache_lookups_total', (('result', result),))] = generation_cache[stat]
+    counters[('quiz_generation_cache_stores_total', ())] = generation_cache['stores']
+    counters[('quiz_generation_cache_memory_entries', ())] = generation_cache['memory_entries']
+
+    lines = []
+    for name, (metric_type, help_text) in HELP.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        if metric_type in ('counter', 'gauge'):
+            for (series_name, labels), value in sorted(counters.items()):
+                if series_name == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_number(value)}')
+            continue
+
+        bounds = _bucket_bounds(name)
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                lines.append(f'{name}_bucket{_format_labels(labels, (("le", bound),))} {cumulative}')
+            lines.append(f'{name}_bucket{_format_labels(labels, (("le", "+Inf"),))} {series[-1]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {_format_number(series[-2])}')
+            lines.append(f'{name}_count{_format_labels(labels)} {series[-1]}')
+    return '\n'.join(lines) + '\n'
+
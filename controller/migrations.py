@@ -0,0 +1,147 @@
+"""
+Lightweight schema migration runner
+db.create_all() only creates missing tables, so changes to existing tables are applied here.
+Each migration runs once per database and is recorded in the schema_migration table.
+"""
+
+from datetime import datetime
+from sqlalchemy import inspect, text
+from controller.database import db
+
+schema_migration = db.Table(
+    'schema_migration',
+    db.Column('id', db.String(100), primary_key=True),
+    db.Column('applied_at', db.DateTime, default=datetime.utcnow)
+)
+
+
+def _create_indexes(*index_names):
+    """
+    Build a migration that creates model-defined indexes missing from an existing database
+    """
+    def migrate(connection):
+        indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+        for name in index_names:
+            index = indexes[name]
+            existing = {item['name'] for item in inspect(connection).get_indexes(index.table.name)}
+            if name in existing:
+                continue
+
+            if index.unique:
+                columns = ', '.join(column.name for column in index.columns)
+                duplicates = connection.execute(text(
+                    f'SELECT {columns} FROM "{index.table.name}" '
+                    f'GROUP BY {columns} HAVING COUNT(*) > 1 LIMIT 1'
+                )).first()
+                if duplicates is not None:
+                    raise RuntimeError(
+                        f'Cannot create unique index {name}: duplicate rows exist in '
+                        f'"{index.table.name}" for ({columns}), e.g. {tuple(duplicates)}'
+                    )
+
+            index.create(bind=connection)
+    return migrate
+
+
+def _add_columns(table_name, *column_names):
+    """
+    Build a migration that adds model-defined columns missing from an existing table (nullable, no default)
+    """
+    def migrate(connection):
+        table = db.metadata.tables[table_name]
+        existing = {column['name'] for column in inspect(connection).get_columns(table_name)}
+        for name in column_names:
+            if name in existing:
+                continue
+            column_type = table.columns[name].type.compile(dialect=connection.dialect)
+            connection.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN "{name}" {column_type}'))
+    return migrate
+
+
+def _delete_duplicate_submissions(connection):
+    """
+    Keep only each student's first submission of a quiz, and one answer per question, so the unique index can be built
+
+    Duplicates come from double submits before the index existed; the first committed submission
+    and its answers have the lowest ids.
+    """
+    duplicated = connection.execute(text(
+        'SELECT quiz_id, student_id FROM quiz_submission GROUP BY quiz_id, student_id HAVING COUNT(*) > 1'
+    )).all()
+    if not duplicated:
+        return
+
+    connection.execute(text(
+        'DELETE FROM quiz_submission WHERE id NOT IN '
+        '(SELECT MIN(id) FROM quiz_submission GROUP BY quiz_id, student_id)'
+    ))
+    for quiz_id, student_id in duplicated:
+        connection.execute(text(
+            'DELETE FROM student_answer WHERE quiz_id = :quiz_id AND student_id = :student_id AND id NOT IN '
+            '(SELECT MIN(id) FROM student_answer WHERE quiz_id = :quiz_id AND student_id = :student_id '
+            'GROUP BY question_id)'
+        ), {'quiz_id': quiz_id, 'student_id': student_id})
+    print(f"⚠️  Removed duplicate submissions for {len(duplicated)} student(s), keeping each first submission")
+
+
+def _in_order(*steps):
+    """
+    Build a migration that runs several steps in one transaction
+    """
+    def migrate(connection):
+        for step in steps:
+            step(connection)
+    return migrate
+
+
+# Ordered list of (migration id, callable taking a connection). Never reorder or rename.
+MIGRATIONS = [
+    ('0001_hot_lookup_indexes', _create_indexes(
+        'ix_quiz_teacher_id',
+        'ix_quiz_is_published',
+        'ix_question_quiz_id',
+        'ix_option_question_id',
+        'ix_student_answer_question_id',
+        'ix_student_answer_quiz_id_student_id',
+        'ix_quiz_submission_student_id',
+        'ix_user_role_role_id',
+    )),
+    ('0002_unique_submission_per_student', _in_order(
+        _delete_duplicate_submissions,
+        _create_indexes('ix_quiz_submission_quiz_id_student_id'),
+    )),
+    ('0003_unique_user_role', _create_indexes(
+        'ix_user_role_user_id_role_id',
+    )),
+    ('0004_student_answer_grading_status', _add_columns(
+        'student_answer', 'grading_status',
+    )),
+]
+
+
+def run_migrations():
+    """
+    Apply pending migrations in order; call after db.create_all() inside an app context
+
+    A failing migration is rolled back and left pending, and startup is aborted: later migrations
+    (and the models) depend on it, so the app must not run against a half-migrated schema.
+
+    Raises:
+        RuntimeError: if a migration fails
+    """
+    schema_migration.create(bind=db.engine, checkfirst=True)
+
+    with db.engine.connect() as connection:
+        applied = {row[0] for row in connection.execute(schema_migration.select())}
+
+    for migration_id, migrate in MIGRATIONS:
+        if migration_id in applied:
+            continue
+        try:
+            with db.engine.begin() as connection:
+                migrate(connection)
+                connection.execute(schema_migration.insert().values(id=migration_id))
+            print(f"✅ Applied migration {migration_id}")
+        except Exception as e:
+            print(f"⚠️  Migration {migration_id} failed: {str(e)}")
+            raise RuntimeError(f'Migration {migration_id} failed; fix the database and restart') from e
@@ -5,7 +5,9 @@ from werkzeug.security import generate_password_hash, check_password_hash
 user_role = db.Table(
     'user_role',
     db.Column('user_id', db.Integer, db.ForeignKey('user.id')),
-    db.Column('role_id', db.Integer, db.ForeignKey('role.id'))
+    db.Column('role_id', db.Integer, db.ForeignKey('role.id')),
+    db.Index('ix_user_role_user_id_role_id', 'user_id', 'role_id', unique=True),
+    db.Index('ix_user_role_role_id', 'role_id')
 )
 
 class Role(db.Model):
@@ -37,18 +39,19 @@ class Quiz(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
-    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    teacher_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     duration_minutes = db.Column(db.Integer, default=30)  # Quiz duration in minutes
     total_marks = db.Column(db.Integer, default=100)
-    is_published = db.Column(db.Boolean, default=False)
+    is_published = db.Column(db.Boolean, default=False, index=True)
     questions = db.relationship('Question', backref='quiz', lazy=True, cascade='all, delete-orphan')
     submissions = db.relationship('QuizSubmission', backref='quiz', lazy=True, cascade='all, delete-orphan')
+    drafts = db.relationship('AttemptDraft', lazy=True, cascade='all, delete-orphan')
 
 class Question(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
     question_text = db.Column(db.Text, nullable=False)
     marks = db.Column(db.Integer, default=1)
     question_type = db.Column(db.String(20), default='mcq')  # mcq, true_false, short_answer
@@ -59,11 +62,15 @@ class Question(db.Model):
 
 class Option(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False, index=True)
     option_text = db.Column(db.Text, nullable=False)
     is_correct = db.Column(db.Boolean, default=False)
 
 class QuizSubmission(db.Model):
+    __table_args__ = (
+        db.Index('ix_quiz_submission_quiz_id_student_id', 'quiz_id', 'student_id', unique=True),
+        db.Index('ix_quiz_submission_student_id', 'student_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
     student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -73,14 +80,51 @@ class QuizSubmission(db.Model):
     student = db.relationship('User', backref='quiz_submissions')
 
 class StudentAnswer(db.Model):
+    __table_args__ = (
+        db.Index('ix_student_answer_quiz_id_student_id', 'quiz_id', 'student_id'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
-    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('question.id'), nullable=False, index=True)
     student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     answer_text = db.Column(db.Text)
     selected_option_id = db.Column(db.Integer, db.ForeignKey('option.id'))
     is_correct = db.Column(db.Boolean)
     marks_obtained = db.Column(db.Float, default=0)
+    grading_status = db.Column(db.String(20))  # short answers: None (not graded yet), auto, review, manual
     quiz = db.relationship('Quiz')
     selected_option = db.relationship('Option')
 
+
+class AttemptDraft(db.Model):
+    __table_args__ = (
+        db.Index('ix_attempt_draft_quiz_id_student_id', 'quiz_id', 'student_id', unique=True),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    answers = db.Column(db.Text, nullable=False)  # JSON: {'question_<id>': value}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class BackgroundJob(db.Model):
+    __table_args__ = (
+        db.Index('ix_background_job_status', 'status'),
+    )
+    id = db.Column(db.String(32), primary_key=True)  # uuid4 hex
+    kind = db.Column(db.String(50), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    status = db.Column(db.String(20), default='queued')  # queued, running, succeeded, failed
+    params = db.Column(db.Text)  # JSON
+    result = db.Column(db.Text)  # JSON
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+class GenerationCacheEntry(db.Model):
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of the normalized prompt inputs
+    model = db.Column(db.String(100))
+    response = db.Column(db.Text, nullable=False)  # JSON list of generated questions
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
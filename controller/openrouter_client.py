@@ -0,0 +1,279 @@
+"""
+Shared OpenRouter client
+One pooled keep-alive HTTP session, one place for timeouts and config, one response-parsing path.
+Set OPENROUTER_API_URL to point all AI traffic at a different (e.g. local stand-in) endpoint.
+"""
+
+import json
+import re
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from controller.metrics import openrouter_call
+
+DEFAULT_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+_session = None
+_lock = threading.Lock()
+
+
+def _setting(config, name, default=None):
+    if config is None:
+        from config import Config
+        return getattr(Config, name, default)
+    return config.get(name, default)
+
+
+def get_session(config=None) -> requests.Session:
+    """
+    Return the process-wide HTTP session, so TCP/TLS connections are reused across calls
+    """
+    global _session
+    with _lock:
+        if _session is None:
+            pool_size = int(_setting(config, 'OPENROUTER_POOL_SIZE', 16))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _session = session
+        return _session
+
+
+def chat_completion(messages: list, config=None, temperature: float = 0.7, max_tokens: int = 1400,
+                    response_format: dict = None) -> str:
+    """
+    Send a chat completion request and return the assistant message content
+
+    Args:
+        config: Mapping with OPENROUTER_* settings (e.g. app.config); defaults to config.Config
+
+    Raises:
+        ValueError: with a user-facing message for every failure mode
+    """
+    api_key = _setting(config, 'OPENROUTER_API_KEY')
+    if not api_key:
+        raise ValueError('OPENROUTER_API_KEY is not configured')
+
+    api_url = _setting(config, 'OPENROUTER_API_URL') or DEFAULT_API_URL
+    timeout_seconds = _setting(config, 'OPENROUTER_TIMEOUT_SECONDS', 25)
+
+    payload = {
+        "model": _setting(config, 'OPENROUTER_MODEL'),
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": False
+    }
+    if response_format:
+        payload["response_format"] = response_format
+
+    with openrouter_call('complete') as call:
+        try:
+            response = get_session(config).post(
+                api_url,
+                json=payload,
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=timeout_seconds
+            )
+        except requests.exceptions.Timeout:
+            call.outcome = 'timeout'
+            raise ValueError(f"OpenRouter request timed out after {timeout_seconds} seconds")
+        except requests.exceptions.ConnectionError as e:
+            call.outcome = 'connection_error'
+            raise ValueError(f"OpenRouter connection error: {str(e)}")
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Unexpected error while calling OpenRouter: {str(e)}")
+
+        if response.status_code >= 400:
+            call.outcome = f'http_{response.status_code}'
+            raise ValueError(f"OpenRouter API error ({response.status_code}): {response.text}")
+
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except Exception:
+            call.outcome = 'bad_response'
+            raise ValueError("OpenRouter returned an unexpected response format")
+
+
+def stream_chat_completion(messages: list, config=None, temperature: float = 0.7, max_tokens: int = 1400,
+                           response_format: dict = None):
+    """
+    Stream a chat completion, yielding content deltas as they arrive
+
+    The whole stream must finish within OPENROUTER_TIMEOUT_SECONDS; otherwise a ValueError
+    is raised after the deltas received so far have been yielded.
+    """
+    api_key = _setting(config, 'OPENROUTER_API_KEY')
+    if not api_key:
+        raise ValueError('OPENROUTER_API_KEY is not configured')
+
+    api_url = _setting(config, 'OPENROUTER_API_URL') or DEFAULT_API_URL
+    timeout_seconds = _setting(config, 'OPENROUTER_TIMEOUT_SECONDS', 25)
+    deadline = time.monotonic() + timeout_seconds
+
+    payload = {
+        "model": _setting(config, 'OPENROUTER_MODEL'),
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "stream": True
+    }
+    if response_format:
+        payload["response_format"] = response_format
+
+    with openrouter_call('stream') as call:
+        try:
+            response = get_session(config).post(
+                api_url,
+                json=payload,
+                headers={"Authorization": f"Bearer {api_key}"},
+                timeout=timeout_seconds,
+                stream=True
+            )
+        except requests.exceptions.Timeout:
+            call.outcome = 'timeout'
+            raise ValueError(f"OpenRouter request timed out after {timeout_seconds} seconds")
+        except requests.exceptions.ConnectionError as e:
+            call.outcome = 'connection_error'
+            raise ValueError(f"OpenRouter connection error: {str(e)}")
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Unexpected error while calling OpenRouter: {str(e)}")
+
+        with response:
+            if response.status_code >= 400:
+                call.outcome = f'http_{response.status_code}'
+                raise ValueError(f"OpenRouter API error ({response.status_code}): {response.text}")
+
+            try:
+                for line in response.iter_lines(decode_unicode=True):
+                    if time.monotonic() > deadline:
+                        call.outcome = 'timeout'
+                        raise ValueError(f"OpenRouter request timed out after {timeout_seconds} seconds")
+                    # Server-sent events: "data: {...}" lines; ":" lines are keep-alive comments
+                    if not line or not line.startswith('data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == '[DONE]':
+                        return
+                    try:
+                        delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        continue
+                    if delta:
+                        yield delta
+            except requests.exceptions.RequestException:
+                call.outcome = 'timeout'
+                raise ValueError(f"OpenRouter request timed out after {timeout_seconds} seconds")
+
+
+class QuestionStreamParser:
+    """
+    Incremental parser that returns each question object as soon as its closing brace arrives
+
+    Accepts {"questions": [{...}, ...]} or a bare [{...}, ...] array, with or without markdown fences.
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.position = 0
+        self.stack = []
+        self.in_string = False
+        self.escaped = False
+        self.item_start = None
+        self.item_depth = None
+
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        questions = []
+
+        while self.position < len(self.buffer):
+            char = self.buffer[self.position]
+
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in '{[':
+                # A question is an object directly inside the first array
+                if char == '{' and self.stack and self.stack[-1] == '[' and self.stack.count('[') == 1:
+                    self.item_start = self.position
+                    self.item_depth = len(self.stack)
+                self.stack.append(char)
+            elif char in '}]' and self.stack:
+                self.stack.pop()
+                if char == '}' and self.item_start is not None and len(self.stack) == self.item_depth:
+                    try:
+                        question = json.loads(self.buffer[self.item_start:self.position + 1])
+                        if isinstance(question, dict):
+                            questions.append(question)
+                    except ValueError:
+                        pass
+                    self.item_start = None
+
+            self.position += 1
+
+        return questions
+
+
+def stream_questions(messages: list, on_question, config=None, **kwargs) -> tuple:
+    """
+    Stream a completion and hand each question to on_question as soon as it is complete
+
+    Returns:
+        (questions, complete) - complete is False when the stream ended early (e.g. timeout)
+        but some questions had already arrived; with no questions the error is raised.
+    """
+    parser = QuestionStreamParser()
+    questions = []
+    try:
+        for delta in stream_chat_completion(messages, config=config, **kwargs):
+            for question in parser.feed(delta):
+                questions.append(question)
+                on_question(question)
+    except ValueError:
+        if not questions:
+            raise
+        return questions, False
+
+    if not questions:
+        raise ValueError("OpenRouter did not return valid questions")
+    return questions, True
+
+
+def parse_json_content(content: str):
+    """
+    Parse JSON from a model reply, tolerating markdown fences and surrounding text
+    """
+    text = (content or '').strip()
+    text = re.sub(r'^```(?:json)?\s*|\s*```$', '', text)
+    try:
+        return json.loads(text)
+    except (TypeError, ValueError):
+        pass
+
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    end = max(text.rfind('}'), text.rfind(']'))
+    if starts and end > min(starts):
+        try:
+            return json.loads(text[min(starts):end + 1])
+        except ValueError:
+            pass
+    raise ValueError("OpenRouter returned an unexpected response format")
+
+
+def parse_questions(content: str) -> list:
+    """
+    Extract the question list from a reply shaped as {"questions": [...]} or a bare JSON array
+    """
+    data = parse_json_content(content)
+    questions = data.get("questions", []) if isinstance(data, dict) else data
+    if not isinstance(questions, list) or not questions:
+        raise ValueError("OpenRouter did not return valid questions")
+    return questions
@@ -0,0 +1,73 @@
+"""
+Platform statistics for the admin dashboard
+Counters are computed with one grouped query, kept current in memory as users and quizzes are
+added or removed, and fully recomputed after a TTL to pick up changes made by other processes.
+"""
+
+import threading
+import time
+from sqlalchemy import func
+from controller.database import db
+from controller.models import User, Role, Quiz, user_role
+
+ROLE_COUNTERS = {'Teacher': 'total_teachers', 'Student': 'total_students'}
+
+_stats = None
+_computed_at = 0.0
+_lock = threading.Lock()
+
+
+def compute_platform_stats() -> dict:
+    """
+    Count users (excluding the built-in admin), users per role and quizzes
+    """
+    role_counts = dict(db.session.query(Role.rolename, func.count(user_role.c.user_id)).outerjoin(
+        user_role, user_role.c.role_id == Role.id
+    ).group_by(Role.rolename).all())
+
+    stats = {
+        'total_users': max(0, db.session.query(func.count(User.id)).scalar() - 1),
+        'total_quizzes': db.session.query(func.count(Quiz.id)).scalar()
+    }
+    for role_name, counter in ROLE_COUNTERS.items():
+        stats[counter] = role_counts.get(role_name, 0)
+    return stats
+
+
+def get_platform_stats(ttl_seconds: int) -> dict:
+    global _stats, _computed_at
+    if _stats is not None and time.monotonic() - _computed_at < ttl_seconds:
+        return dict(_stats)
+
+    stats = compute_platform_stats()
+    with _lock:
+        _stats = stats
+        _computed_at = time.monotonic()
+    return dict(stats)
+
+
+def record_user_added(role_name: str):
+    _adjust('total_users', 1, role_name)
+
+
+def record_user_deleted(role_name: str):
+    _adjust('total_users', -1, role_name)
+
+
+def record_quiz_added():
+    _adjust('total_quizzes', 1)
+
+
+def record_quiz_deleted():
+    _adjust('total_quizzes', -1)
+
+
+def _adjust(counter: str, delta: int, role_name: str = None):
+    # Call after the commit; nothing to adjust until the stats have been computed once
+    with _lock:
+        if _stats is None:
+            return
+        _stats[counter] = max(0, _stats[counter] + delta)
+        if role_name in ROLE_COUNTERS:
+            role_counter = ROLE_COUNTERS[role_name]
+            _stats[role_counter] = max(0, _stats[role_counter] + delta)
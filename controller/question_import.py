@@ -0,0 +1,202 @@
+"""
+Question validation and bulk import
+validate_question() holds the rules add_question enforces; imports apply them to every row of a
+CSV/JSON file and insert the whole batch with bulk INSERTs in one transaction.
+"""
+
+import csv
+import io
+import json
+from sqlalchemy import insert
+from controller.database import db
+from controller.models import Question, Option
+
+QUESTION_TYPES = ('mcq', 'true_false', 'short_answer')
+CSV_OPTION_SEPARATOR = '|'
+
+
+def validate_question(question_text, question_type, marks=1, options=None, correct_option=None,
+                      correct_answer=None) -> dict:
+    """
+    Validate one question the way the add-question form does
+
+    Args:
+        options: Option texts (MCQ only)
+        correct_option: Index of the correct option as a string, e.g. '0' (MCQ only)
+
+    Returns:
+        {'question': Question column dict, 'options': [{'option_text', 'is_correct'}, ...]}
+
+    Raises:
+        ValueError: with the message shown to the teacher
+    """
+    if not question_text or not question_type:
+        raise ValueError('Question text and type are required')
+    if question_type not in QUESTION_TYPES:
+        raise ValueError(f'Invalid question type: {question_type}')
+
+    try:
+        marks = int(marks if marks not in (None, '') else 1)
+    except (TypeError, ValueError):
+        raise ValueError('Marks must be a whole number')
+
+    question = {
+        'question_text': question_text,
+        'question_type': question_type,
+        'marks': marks,
+        'correct_answer': None
+    }
+    option_rows = []
+
+    if question_type == 'mcq':
+        options = list(options or [])
+        correct_option = '' if correct_option is None else str(correct_option).strip()
+
+        if len(options) < 2:
+            raise ValueError('At least 2 options required for MCQ')
+        # Dropping an empty option would shift correct_option onto a different one
+        if any(not str(option).strip() for option in options):
+            raise ValueError('Options cannot be empty')
+        if not correct_option:
+            raise ValueError('Please select which option is correct!')
+        if not correct_option.isdigit() or int(correct_option) >= len(options):
+            raise ValueError('Invalid correct option selection')
+
+        option_rows = [
+            {'option_text': option_text, 'is_correct': i == int(correct_option)}
+            for i, option_text in enumerate(options)
+        ]
+
+    elif question_type == 'true_false':
+        if not correct_answer or correct_answer not in ['True', 'False']:
+            raise ValueError('Please select a valid correct answer (True or False)')
+        question['correct_answer'] = correct_answer
+
+    elif question_type == 'short_answer':
+        correct_answer = (correct_answer or '').strip()
+        if not correct_answer:
+            raise ValueError('Please provide a correct answer for the short answer question')
+        question['correct_answer'] = correct_answer
+
+    return {'question': question, 'options': option_rows}
+
+
+def _csv_rows(text: str) -> list:
+    """
+    CSV columns: question_text, question_type, marks, options (separated by '|'),
+    correct_option (0-based index) and correct_answer. Data rows are numbered from 2.
+    """
+    rows = []
+    for line_number, record in enumerate(csv.DictReader(io.StringIO(text)), start=2):
+        # DictReader puts the cells beyond the header in a list under the None key
+        if None in record:
+            rows.append((line_number, 'Row has more columns than the header'))
+            continue
+        record = {key.strip().lower(): (value or '').strip() for key, value in record.items()}
+        options = [option.strip() for option in record.get('options', '').split(CSV_OPTION_SEPARATOR)]
+        rows.append((line_number, {
+            'question_text': record.get('question_text'),
+            'question_type': record.get('question_type', '').lower(),
+            'marks': record.get('marks'),
+            'options': options,
+            'correct_option': record.get('correct_option'),
+            'correct_answer': record.get('correct_answer')
+        }))
+    return rows
+
+
+def _json_rows(text: str) -> list:
+    """
+    JSON: a list of question objects, or {"questions": [...]}; options is a list of strings.
+    correct_option_index (the AI generator's field name) is accepted for correct_option.
+    """
+    data = json.loads(text)
+    items = data.get('questions') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError('JSON must be a list of questions or {"questions": [...]}')
+
+    rows = []
+    for number, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            rows.append((number, 'Each question must be an object'))
+            continue
+        correct_option = item.get('correct_option', item.get('correct_option_index'))
+        options = item.get('options') or []
+        rows.append((number, {
+            'question_text': str(item.get('question_text') or '').strip(),
+            'question_type': str(item.get('question_type') or '').strip().lower(),
+            'marks': item.get('marks'),
+            'options': [str(option).strip() for option in options] if isinstance(options, list) else [],
+            'correct_option': None if correct_option is None else str(correct_option),
+            'correct_answer': None if item.get('correct_answer') is None else str(item['correct_answer']).strip()
+        }))
+    return rows
+
+
+def parse_import_file(filename: str, content: bytes) -> list:
+    """
+    Parse an uploaded CSV or JSON question file into (row number, fields) pairs
+
+    fields is an error message instead for rows that can't be read as a question.
+
+    Raises:
+        ValueError: if the file can't be read at all
+    """
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ValueError('File must be UTF-8 encoded')
+
+    if (filename or '').lower().endswith('.json'):
+        try:
+            return _json_rows(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f'Invalid JSON: {e}')
+    if (filename or '').lower().endswith('.csv'):
+        return _csv_rows(text)
+    raise ValueError('Upload a .csv or .json file')
+
+
+def validate_rows(rows: list) -> tuple:
+    """
+    Validate every parsed row
+
+    Returns:
+        (validated questions, [(row number, error message), ...])
+    """
+    validated = []
+    errors = []
+    for number, fields in rows:
+        if isinstance(fields, str):
+            errors.append((number, fields))
+            continue
+        try:
+            validated.append(validate_question(**fields))
+        except ValueError as e:
+            errors.append((number, str(e)))
+    return validated, errors
+
+
+def import_questions(quiz_id: int, validated: list) -> list:
+    """
+    Insert validated questions and their options with two bulk INSERTs, then commit
+
+    Returns:
+        Inserted rows with id, quiz_id and question_text, in input order
+    """
+    inserted = db.session.execute(
+        insert(Question).returning(
+            Question.id, Question.quiz_id, Question.question_text, sort_by_parameter_order=True
+        ),
+        [dict(item['question'], quiz_id=quiz_id) for item in validated]
+    ).all()
+
+    option_rows = [
+        dict(option, question_id=row.id)
+        for row, item in zip(inserted, validated)
+        for option in item['options']
+    ]
+    if option_rows:
+        db.session.execute(insert(Option.__table__), option_rows)
+    db.session.commit()
+    return inserted
@@ -0,0 +1,48 @@
+"""
+Cached rendering of quiz questions for students
+Renders the take_quiz question block once per quiz version instead of once per student
+"""
+
+import threading
+from flask import render_template
+from markupsafe import Markup
+from sqlalchemy.orm import selectinload
+from controller.database import db
+from controller.models import Question
+
+_fragments = {}
+_lock = threading.Lock()
+
+
+def render_quiz_questions(quiz) -> tuple:
+    """
+    Return the rendered question block for a quiz and its question count
+
+    The cached HTML is keyed on Quiz.updated_at and the quiz's question ids, so any
+    edit to the quiz or its question set renders a fresh block on the next request.
+
+    Returns:
+        (Markup html, int question_count)
+    """
+    question_ids = tuple(
+        question_id for (question_id,) in db.session.query(Question.id)
+        .filter(Question.quiz_id == quiz.id)
+        .order_by(Question.id)
+    )
+    signature = (quiz.updated_at, question_ids)
+
+    cached = _fragments.get(quiz.id)
+    if cached and cached[0] == signature:
+        return cached[1], len(question_ids)
+
+    # Questions and all their options in two queries
+    questions = Question.query.options(selectinload(Question.options)).filter(
+        Question.quiz_id == quiz.id
+    ).order_by(Question.id).all()
+
+    html = Markup(render_template('take_quiz_questions.html', questions=questions))
+    signature = (quiz.updated_at, tuple(question.id for question in questions))
+    with _lock:
+        _fragments[quiz.id] = (signature, html)
+
+    return html, len(questions)
@@ -0,0 +1,120 @@
+"""
+Bulk re-grading of quiz submissions
+Recomputes StudentAnswer and QuizSubmission scores in one vectorized pass after answer-key changes
+"""
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import update
+from controller.database import db
+from controller.models import StudentAnswer, QuizSubmission
+from controller.answer_key import compile_answer_key, invalidate_answer_key
+from controller.submissions import bump_grading_generation
+
+# Auto-graded question types; short answers keep their manually awarded marks
+TYPE_CODES = {'mcq': 1, 'true_false': 2}
+
+
+def _answer_frame(quiz_id: int) -> pd.DataFrame:
+    rows = db.session.query(
+        StudentAnswer.id,
+        StudentAnswer.question_id,
+        StudentAnswer.student_id,
+        StudentAnswer.selected_option_id,
+        StudentAnswer.answer_text,
+        StudentAnswer.is_correct,
+        StudentAnswer.marks_obtained
+    ).filter(StudentAnswer.quiz_id == quiz_id).all()
+
+    return pd.DataFrame(rows, columns=[
+        'id', 'question_id', 'student_id', 'selected_option_id',
+        'answer_text', 'is_correct', 'marks_obtained'
+    ])
+
+
+def regrade_quiz(quiz_id: int) -> dict:
+    """
+    Re-grade every stored answer of a quiz against its current answer key
+
+    MCQ and True/False answers are re-evaluated; short answers keep their marks.
+    Each submission's score and total_marks are then recomputed from its answers.
+
+    Returns:
+        {'answers': int, 'answers_updated': int, 'submissions_updated': int}
+    """
+    invalidate_answer_key(quiz_id)
+    answer_key = compile_answer_key(quiz_id)
+    frame = _answer_frame(quiz_id)
+
+    summary = {'answers': len(frame), 'answers_updated': 0, 'submissions_updated': 0}
+
+    # Question lookup tables sorted by id, with a sentinel row so lookups never index an empty array
+    entries = [{'question_id': -1, 'question_type': None, 'marks': 0, 'correct_answer': None}]
+    entries += sorted(answer_key.entries, key=lambda entry: entry['question_id'])
+    key_ids = np.array([entry['question_id'] for entry in entries], dtype=np.int64)
+    key_types = np.array([TYPE_CODES.get(entry['question_type'], 0) for entry in entries], dtype=np.int8)
+    key_marks = np.array([entry['marks'] for entry in entries], dtype=np.float64)
+    key_answers = np.array([entry['correct_answer'] or '' for entry in entries], dtype=object)
+    correct_pairs = np.array([
+        (entry['question_id'] << 32) | option_id
+        for entry in entries[1:]
+        for option_id in entry['correct_option_ids']
+    ], dtype=np.int64)
+
+    if len(frame):
+        question_ids = frame['question_id'].to_numpy(dtype=np.int64)
+        position = np.minimum(np.searchsorted(key_ids, question_ids), len(key_ids) - 1)
+        position = np.where(key_ids[position] == question_ids, position, 0)
+
+        question_type = key_types[position]
+        question_marks = key_marks[position]
+
+        # MCQ: the (question, option) pair must be one of the correct pairs
+        selected = frame['selected_option_id'].fillna(-1).to_numpy(dtype=np.int64)
+        mcq_correct = (selected >= 0) & np.isin((question_ids << 32) | np.maximum(selected, 0), correct_pairs)
+
+        # True/False: exact match after stripping whitespace
+        answer_text = frame['answer_text'].fillna('').astype(str).str.strip().to_numpy(dtype=object)
+        expected = key_answers[position]
+        tf_correct = (answer_text != '') & (expected != '') & (answer_text == expected)
+
+        old_correct = frame['is_correct'].to_numpy(dtype=object).astype(bool)
+        old_marks = frame['marks_obtained'].fillna(0).to_numpy(dtype=np.float64)
+
+        is_correct = np.select([question_type == 1, question_type == 2], [mcq_correct, tf_correct], old_correct)
+        marks = np.where(question_type > 0, np.where(is_correct, question_marks, 0.0), old_marks)
+
+        changed = (question_type > 0) & (
+            (is_correct != old_correct) | (marks != old_marks) | frame['is_correct'].isna().to_numpy()
+        )
+        answer_ids = frame['id'].to_numpy(dtype=np.int64)
+        if changed.any():
+            db.session.execute(update(StudentAnswer), [
+                {'id': int(answer_id), 'is_correct': bool(correct), 'marks_obtained': float(mark)}
+                for answer_id, correct, mark in zip(answer_ids[changed], is_correct[changed], marks[changed])
+            ])
+            summary['answers_updated'] = int(changed.sum())
+
+        student_ids, student_index = np.unique(frame['student_id'].to_numpy(dtype=np.int64), return_inverse=True)
+        student_scores = np.bincount(student_index, weights=marks, minlength=len(student_ids))
+        scores = dict(zip(student_ids.tolist(), student_scores.tolist()))
+    else:
+        scores = {}
+
+    total_marks = float(answer_key.total_marks)
+    submission_updates = []
+    submissions = db.session.query(
+        QuizSubmission.id, QuizSubmission.student_id, QuizSubmission.score, QuizSubmission.total_marks
+    ).filter(QuizSubmission.quiz_id == quiz_id).all()
+    for submission_id, student_id, score, submission_total in submissions:
+        new_score = scores.get(student_id, 0.0)
+        if score != new_score or submission_total != total_marks:
+            submission_updates.append({'id': submission_id, 'score': new_score, 'total_marks': total_marks})
+
+    if submission_updates:
+        db.session.execute(update(QuizSubmission), submission_updates)
+        summary['submissions_updated'] = len(submission_updates)
+
+    db.session.commit()
+    bump_grading_generation(quiz_id)
+    return summary
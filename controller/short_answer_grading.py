@@ -0,0 +1,204 @@
+"""
+Short-answer auto-grading
+Answers are normalized (case, whitespace, punctuation, number formatting) and compared with the
+question's correct answer: exact matches and numbers within tolerance are accepted outright, the rest
+are scored by TF-IDF weighted character n-gram cosine similarity, computed for a whole quiz in one
+NumPy pass. Scores at or above the accept threshold earn full marks; scores in the review band are
+left at zero marks and flagged for the teacher.
+"""
+
+import re
+import unicodedata
+import numpy as np
+from sqlalchemy import or_, update
+from controller.database import db
+from controller.models import Question, StudentAnswer
+from controller.submissions import bump_grading_generation, refresh_submission_scores
+
+NGRAM_SIZES = (2, 3, 4)
+
+# StudentAnswer.grading_status values for short answers; None means not graded yet
+GRADED_AUTO = 'auto'
+GRADED_REVIEW = 'review'
+GRADED_MANUAL = 'manual'
+
+_THOUSANDS = re.compile(r'(?<=\d),(?=\d{3}\b)')
+_TOKEN = re.compile(r'-?\d+(?:\.\d+)?|[^\W_]+')
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+def _canonical_number(token: str) -> str:
+    return '%.12g' % float(token)
+
+
+def normalize_answer(text) -> str:
+    """
+    Case-fold, drop punctuation, collapse whitespace and write numbers canonically ('3.50' -> '3.5')
+    """
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = _THOUSANDS.sub('', text)
+    tokens = _TOKEN.findall(text)
+    return ' '.join(_canonical_number(token) if _NUMBER.fullmatch(token) else token for token in tokens)
+
+
+def numeric_value(normalized: str):
+    """
+    The number a normalized answer consists of, or None if it is not a single number
+    """
+    if _NUMBER.fullmatch(normalized):
+        return float(normalized)
+    return None
+
+
+def same_answer(normalized: str, reference: str) -> bool:
+    """
+    Exact match of two normalized answers, ignoring how words are split ('photo-synthesis', 'photosynthesis')
+    """
+    return bool(normalized) and bool(reference) and normalized.replace(' ', '') == reference.replace(' ', '')
+
+
+def similarity_scores(answers: list, references: list, reference_of) -> np.ndarray:
+    """
+    Cosine similarity of TF-IDF weighted character n-grams between answers[i] and references[reference_of[i]]
+
+    All texts should be normalized and non-empty. Document frequencies are taken over the
+    references and answers together, so n-grams every answer shares weigh little.
+
+    Returns:
+        float array with one score in [0, 1] per answer
+    """
+    if not answers:
+        return np.zeros(0)
+
+    documents = list(references) + list(answers)
+    vocabulary = {}
+    doc_ids, term_ids = [], []
+    for doc, text in enumerate(documents):
+        padded = f' {text} '
+        ids = [
+            vocabulary.setdefault(padded[start:start + size], len(vocabulary))
+            for size in NGRAM_SIZES
+            for start in range(len(padded) - size + 1)
+        ]
+        term_ids.extend(ids)
+        doc_ids.extend([doc] * len(ids))
+
+    # One sorted key per (document, term) pair; the term frequency is how often the key repeats
+    size = max(len(vocabulary), 1)
+    keys, counts = np.unique(np.asarray(doc_ids, dtype=np.int64) * size + np.asarray(term_ids, dtype=np.int64),
+                             return_counts=True)
+    docs, terms = keys // size, keys % size
+
+    document_frequency = np.bincount(terms, minlength=size)
+    idf = np.log((1 + len(documents)) / (1 + document_frequency)) + 1.0
+    weights = (1.0 + np.log(counts)) * idf[terms]
+    norms = np.sqrt(np.bincount(docs, weights=weights ** 2, minlength=len(documents)))
+    weights /= np.where(norms > 0, norms, 1.0)[docs]
+
+    # Dot products: look each answer term up in its reference document's slice of the key array
+    first_answer = len(references)
+    is_answer = docs >= first_answer
+    answer_index = docs[is_answer] - first_answer
+    lookup = np.asarray(reference_of, dtype=np.int64)[answer_index] * size + terms[is_answer]
+    position = np.minimum(np.searchsorted(keys, lookup), len(keys) - 1)
+    products = np.where(keys[position] == lookup, weights[is_answer] * weights[position], 0.0)
+
+    return np.clip(np.bincount(answer_index, weights=products, minlength=len(answers)), 0.0, 1.0)
+
+
+def grade_short_answers(quiz_id: int, accept_threshold: float = 0.85, review_threshold: float = 0.6,
+                        numeric_tolerance: float = 0.01) -> dict:
+    """
+    Auto-grade every short answer of a quiz that a teacher hasn't graded by hand, then refresh scores
+
+    Args:
+        accept_threshold: Similarity at or above which an answer earns full marks
+        review_threshold: Similarity at or above which a rejected answer is flagged for review
+        numeric_tolerance: Allowed relative difference when both answers are numbers
+
+    Returns:
+        {'answers', 'accepted', 'review', 'rejected', 'answers_updated', 'submissions_updated'}
+    """
+    if review_threshold > accept_threshold:
+        raise ValueError('The review threshold cannot be above the accept threshold')
+
+    summary = {'answers': 0, 'accepted': 0, 'review': 0, 'rejected': 0,
+               'answers_updated': 0, 'submissions_updated': 0}
+
+    questions = db.session.query(Question.id, Question.marks, Question.correct_answer).filter(
+        Question.quiz_id == quiz_id, Question.question_type == 'short_answer'
+    ).all()
+    if not questions:
+        return summary
+    references = {question_id: normalize_answer(correct_answer) for question_id, _, correct_answer in questions}
+    marks_by_question = {question_id: marks or 0 for question_id, marks, _ in questions}
+
+    rows = db.session.query(
+        StudentAnswer.id, StudentAnswer.question_id, StudentAnswer.student_id, StudentAnswer.answer_text,
+        StudentAnswer.is_correct, StudentAnswer.marks_obtained, StudentAnswer.grading_status
+    ).filter(
+        StudentAnswer.quiz_id == quiz_id,
+        StudentAnswer.question_id.in_(list(references)),
+        or_(StudentAnswer.grading_status.is_(None), StudentAnswer.grading_status != GRADED_MANUAL)
+    ).all()
+    summary['answers'] = len(rows)
+    if not rows:
+        return summary
+
+    # Grade each distinct (question, normalized answer) once; most classes repeat a few phrasings
+    distinct = {}
+    row_distinct = np.empty(len(rows), dtype=np.int64)
+    for index, row in enumerate(rows):
+        key = (row.question_id, normalize_answer(row.answer_text))
+        row_distinct[index] = distinct.setdefault(key, len(distinct))
+
+    scores = np.zeros(len(distinct))
+    fuzzy_positions, fuzzy_answers, fuzzy_references = [], [], []
+    reference_ids = list(references)
+    reference_position = {question_id: i for i, question_id in enumerate(reference_ids)}
+    for (question_id, answer), position in distinct.items():
+        reference = references[question_id]
+        if not answer or not reference:
+            continue
+        if same_answer(answer, reference):
+            scores[position] = 1.0
+            continue
+        expected_number, given_number = numeric_value(reference), numeric_value(answer)
+        if expected_number is not None and given_number is not None:
+            tolerance = numeric_tolerance * max(abs(expected_number), 1.0)
+            scores[position] = 1.0 if abs(given_number - expected_number) <= tolerance else 0.0
+            continue
+        fuzzy_positions.append(position)
+        fuzzy_answers.append(answer)
+        fuzzy_references.append(reference_position[question_id])
+
+    scores[fuzzy_positions] = similarity_scores(
+        fuzzy_answers, [references[question_id] for question_id in reference_ids], fuzzy_references
+    )
+
+    row_scores = scores[row_distinct]
+    accepted = row_scores >= accept_threshold
+    review = ~accepted & (row_scores >= review_threshold)
+    summary['accepted'] = int(accepted.sum())
+    summary['review'] = int(review.sum())
+    summary['rejected'] = len(rows) - summary['accepted'] - summary['review']
+
+    updates = []
+    affected_students = set()
+    for row, is_correct, needs_review in zip(rows, accepted.tolist(), review.tolist()):
+        marks = float(marks_by_question[row.question_id]) if is_correct else 0.0
+        status = GRADED_REVIEW if needs_review else GRADED_AUTO
+        if row.is_correct != is_correct or (row.marks_obtained or 0) != marks or row.grading_status != status:
+            updates.append({'id': row.id, 'is_correct': is_correct, 'marks_obtained': marks, 'grading_status': status})
+            if (row.marks_obtained or 0) != marks:
+                affected_students.add(row.student_id)
+
+    if updates:
+        db.session.execute(update(StudentAnswer), updates)
+        summary['answers_updated'] = len(updates)
+    if affected_students:
+        summary['submissions_updated'] = refresh_submission_scores(quiz_id, affected_students)
+
+    db.session.commit()
+    bump_grading_generation(quiz_id)
+    return summary
@@ -0,0 +1,84 @@
+"""
+Submission persistence
+Writes a graded submission and all of its answers with bulk core INSERTs in one short transaction
+"""
+
+import threading
+from datetime import datetime
+from sqlalchemy import func, insert, select, update
+from controller.database import db
+from controller.models import QuizSubmission, StudentAnswer
+
+_grading_generations = {}
+_lock = threading.Lock()
+
+
+def save_submission(quiz_id: int, student_id: int, score, total_marks, answers: list):
+    """
+    Insert a graded submission and its answers, then commit
+
+    Grading must already be done so the write lock is only held for the INSERTs.
+
+    Args:
+        answers: StudentAnswer column dicts as returned by grade_answers()
+    """
+    answer_rows = [
+        dict(answer, quiz_id=quiz_id, student_id=student_id)
+        for answer in answers
+    ]
+
+    db.session.execute(insert(QuizSubmission.__table__), {
+        'quiz_id': quiz_id,
+        'student_id': student_id,
+        'submitted_at': datetime.utcnow(),
+        'score': score,
+        'total_marks': total_marks
+    })
+    if answer_rows:
+        db.session.execute(insert(StudentAnswer.__table__), answer_rows)
+    db.session.commit()
+
+
+def bump_grading_generation(quiz_id: int):
+    """
+    Record that stored answers of a quiz were re-graded (marks or correctness may have changed)
+    """
+    with _lock:
+        _grading_generations[quiz_id] = _grading_generations.get(quiz_id, 0) + 1
+
+
+def grading_generation(quiz_id: int) -> int:
+    """
+    Counter bumped on every re-grade, for caches derived from a quiz's answer marks
+    """
+    return _grading_generations.get(quiz_id, 0)
+
+
+def refresh_submission_scores(quiz_id: int, student_ids=None, chunk_size: int = 500) -> int:
+    """
+    Recompute submission scores as the sum of their answers' marks with set-based UPDATEs
+
+    The caller commits.
+
+    Args:
+        student_ids: Only refresh these students' submissions (default: every submission of the quiz)
+
+    Returns:
+        Number of submissions updated
+    """
+    answer_marks = select(func.coalesce(func.sum(StudentAnswer.marks_obtained), 0)).where(
+        StudentAnswer.quiz_id == QuizSubmission.quiz_id,
+        StudentAnswer.student_id == QuizSubmission.student_id
+    ).scalar_subquery()
+    statement = update(QuizSubmission).where(QuizSubmission.quiz_id == quiz_id).values(score=answer_marks)
+    statement = statement.execution_options(synchronize_session=False)
+
+    if student_ids is None:
+        return db.session.execute(statement).rowcount
+
+    student_ids = sorted(student_ids)
+    updated = 0
+    for start in range(0, len(student_ids), chunk_size):
+        chunk = student_ids[start:start + chunk_size]
+        updated += db.session.execute(statement.where(QuizSubmission.student_id.in_(chunk))).rowcount
+    return updated
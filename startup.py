@@ -19,6 +19,7 @@ if __name__ == "__main__":
     print("   Password: admin123")
     
     print("\n🌐 Access the app at: http://localhost:5000")
+    print("📈 Metrics (admin only): http://localhost:5000/admin/metrics")
     print("\n⚙️  Running on debug mode...")
     print("=" * 60 + "\n")
     